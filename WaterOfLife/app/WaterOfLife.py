@@ -1,22 +1,23 @@
 from pathlib import Path
-import pandas as pd
-from datetime import datetime  
 import uuid
 import streamlit as st
 from page_counter import increase_page_view
-increase_page_view("홈")
+from change_notifier import unsubscribe_current_session
+import event_store
+from profiler import maybe_profile_page
+from warmup import start_warmup
+import load_guard
+from static_assets import asset_url
+maybe_profile_page(__file__)   # ?profile=1&token=... 일 때만 동작
+start_warmup()   # 프로세스당 한 번 - 카탈로그/추천/Supabase/통계 캐시를 미리 채움
+load_guard.begin_run()   # 스크립트 실행 시간/동시 실행 수 측정 (과부하 모드 판단)
+unsubscribe_current_session()
 
 if "client_id" not in st.session_state:
     st.session_state["client_id"] = str(uuid.uuid4())
 
 client_id = st.session_state.get("client_id", "unknown")
-
-ROOT_DIR = Path(__file__).resolve().parents[2] 
-DATA_DIR = ROOT_DIR / "data"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
-
-EVENT_CSV = DATA_DIR / "events.csv"
-
+increase_page_view("홈", client_id)
 
 # -----------------------------
 # 이미지 경로 설정
@@ -35,18 +36,7 @@ st.set_page_config(
     layout="centered",
 )
 def log_event(event_name: str):
-    df_new = pd.DataFrame({
-        "timestamp": [datetime.now().isoformat()],
-        "client_id": [client_id],   # 🔥 누가 했는지
-        "event": [event_name],      # "survey_completed" / "stats_viewed"
-    })
-    if EVENT_CSV.exists():
-        df_old = pd.read_csv(EVENT_CSV)
-        df_all = pd.concat([df_old, df_new], ignore_index=True)
-    else:
-        df_all = df_new
-
-    df_all.to_csv(EVENT_CSV, index=False)
+    event_store.log_event(client_id, event_name)
 log_event("home_viewed")
 
 
@@ -60,9 +50,12 @@ st.sidebar.markdown("취향 기반 술 추천 바")
 # -----------------------------
 # 메인 타이틀 섹션
 # -----------------------------
-st.image(img("0_LiqureMate.png"))
+# 이미지는 내용 해시 이름의 정적 URL (static_assets.py) - 재방문 시 브라우저 캐시 사용
+st.image(asset_url("0_LiqureMate.png"))
 st.markdown("### 취향으로 찾아가는, 나만의 한 잔")
-st.image(img("2_MainBanner.png"))
+banner_url = asset_url("2_MainBanner.png")
+if banner_url:   # 배너 파일이 아직 없으면 건너뜀
+    st.image(banner_url)
 
 st.markdown(
     """
@@ -107,7 +100,7 @@ with col1:
 
 with col2:
     st.image(
-        img("mainpage_warehouse.png"),
+        asset_url("mainpage_warehouse.png"),
         caption="당신의 취향에 맞는 한 잔을 찾는 공간, 생명의물",
     )
 
@@ -213,5 +206,6 @@ st.markdown(
 # 버튼 클릭 → 설문 페이지로 이동
 clicked = st.button("🍸 나에게 맞는 술 찾기")
 
+load_guard.end_run("page_run.home")
 if clicked:
     st.switch_page("pages/01_survey.py")
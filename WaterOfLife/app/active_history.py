@@ -0,0 +1,126 @@
+import atexit
+import fcntl
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+import perf
+from settings import DATA_DIR, get_setting
+
+# 실시간 사용자 수 기록 - 기본 24시간 × 10초 = 8640칸 (칸당 12바이트, 약 100KB)
+RESOLUTION_SECONDS = get_setting("ACTIVE_HISTORY_RESOLUTION", 10)
+HISTORY_HOURS = get_setting("ACTIVE_HISTORY_HOURS", 24)
+SLOTS = HISTORY_HOURS * 3600 // RESOLUTION_SECONDS
+HISTORY_PATH = DATA_DIR / "active_users.ring"
+ELECTION_INTERVAL = 30.0   # 기록 담당이 아닌 프로세스가 담당 자리를 다시 노려보는 주기
+
+# 칸마다 (몇 번째 구간인지, 사용자 수) - 구간 번호가 맞지 않는 칸은 한 바퀴 전 값이라 무시
+RECORD = np.dtype([("slot", "<i8"), ("count", "<i4")])
+
+
+class ActiveUserRing:
+    """고정 크기 링 버퍼를 파일에 mmap - 기록 프로세스 하나가 쓰고 모든 워커가 조회 없이 읽음
+
+    파일 자체가 저장본이라 재시작해도 이어서 기록됨
+    """
+
+    def __init__(self, path=HISTORY_PATH, slots: int = SLOTS, resolution: int = RESOLUTION_SECONDS):
+        self.path = path
+        self.slots = slots
+        self.resolution = resolution
+        self._writer = None
+        self._reader = None
+
+    def _open_writer(self):
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # 크기가 다르면(설정 변경) 새로 시작
+            if not self.path.exists() or self.path.stat().st_size != self.slots * RECORD.itemsize:
+                np.zeros(self.slots, dtype=RECORD).tofile(self.path)
+            self._writer = np.memmap(self.path, dtype=RECORD, mode="r+", shape=(self.slots,))
+        return self._writer
+
+    def _open_reader(self):
+        """기록 중인 프로세스면 같은 map, 아니면 읽기 전용 map (파일이 아직 없으면 None)"""
+        if self._writer is not None:
+            return self._writer
+        if self._reader is None and self.path.exists() and self.path.stat().st_size == self.slots * RECORD.itemsize:
+            self._reader = np.memmap(self.path, dtype=RECORD, mode="r", shape=(self.slots,))
+        return self._reader
+
+    def record(self, count: int, now: float = None):
+        ring = self._open_writer()
+        slot = int((now or time.time()) // self.resolution)
+        i = slot % self.slots
+        # 읽는 쪽이 새 구간 번호 + 이전 값을 보지 않도록 값 먼저
+        ring["count"][i] = count
+        ring["slot"][i] = slot
+
+    def flush(self):
+        if self._writer is not None:
+            self._writer.flush()
+
+    def series(self, now: float = None):
+        """최근 HISTORY_HOURS 동안의 (시각 → 사용자 수) pandas Series (비어 있는 구간은 빠짐)"""
+        import pandas as pd
+
+        ring = self._open_reader()
+        if ring is None:
+            return pd.Series(dtype="int32", name="실시간 사용자")
+        records = np.array(ring)   # 복사본 - 읽는 동안 기록이 바뀌어도 일관됨
+        current = int((now or time.time()) // self.resolution)
+        valid = (records["slot"] > current - self.slots) & (records["slot"] <= current)
+        records = np.sort(records[valid], order="slot")
+        # 이벤트 timestamp 처럼 서버 현지 시각 (timezone 없음)
+        index = pd.to_datetime(records["slot"] * self.resolution, unit="s", utc=True)
+        index = index.tz_convert(datetime.now().astimezone().tzinfo).tz_localize(None)
+        return pd.Series(records["count"], index=index, name="실시간 사용자")
+
+
+_ring = ActiveUserRing()
+
+
+def history(now: float = None):
+    return _ring.series(now)
+
+
+# ---------------------------- #
+#        기록 스레드
+# ---------------------------- #
+
+def _try_become_sampler():
+    """호스트에서 한 프로세스만 Supabase 를 조회해 기록 (잠금 파일을 열어 둔 채 반환)"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    lock_file = open(DATA_DIR / ".active_history.lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def run_sampler(stop: threading.Event = None):
+    stop = stop or threading.Event()
+    lock_file = None
+    while lock_file is None and not stop.is_set():
+        lock_file = _try_become_sampler()
+        if lock_file is None:
+            stop.wait(ELECTION_INTERVAL)
+    if lock_file is None:
+        return
+
+    from realtime_users import count_active_users
+
+    atexit.register(_ring.flush)   # 종료 시 디스크에 확실히 반영
+    while not stop.is_set():
+        try:
+            with perf.span("active_history.sample"):
+                _ring.record(count_active_users())
+        except Exception as e:
+            print("[active_history] 기록 실패:", repr(e))
+            perf.count_error("active_history.sample")
+        # 구간 경계에 맞춰 일정한 간격으로
+        stop.wait(RESOLUTION_SECONDS - time.time() % RESOLUTION_SECONDS)
@@ -0,0 +1,19 @@
+import hmac
+
+import streamlit as st
+
+from settings import get_setting
+
+
+def is_admin() -> bool:
+    """?token=... 쿼리 파라미터가 ADMIN_TOKEN 설정과 일치하는지 (설정이 없으면 항상 False)"""
+    expected = get_setting("ADMIN_TOKEN", "")
+    given = st.query_params.get("token", "")
+    return bool(expected) and hmac.compare_digest(given, expected)
+
+
+def require_admin():
+    """관리자 페이지 맨 위에서 호출 - 토큰이 없으면 아무것도 보여주지 않고 중단"""
+    if not is_admin():
+        st.info("관리자 전용 페이지입니다.")
+        st.stop()
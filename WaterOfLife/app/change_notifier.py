@@ -0,0 +1,153 @@
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from settings import DATA_DIR
+
+POLL_INTERVAL = 1.0        # 데이터 파일 stat 확인 주기 (초)
+MIN_WAKE_INTERVAL = 5.0    # 구독 세션을 깨우는 최소 간격 (초) - 몰려오는 변경은 한 번으로 합침
+# 통계 게시자가 새 데이터로 스냅샷을 게시할 때마다 갱신하는 파일 - 모든 프로세스의 감시자가 함께 봄
+PUBLISHED_MARKER = DATA_DIR / "snapshots" / ".published"
+
+
+# ---------------------------- #
+#        CHANGE NOTIFIER
+# ---------------------------- #
+
+class ChangeNotifier:
+    """데이터 디렉터리(events/survey CSV)나 게시된 통계 스냅샷이 바뀌었을 때만 구독 세션을 rerun 시키는 감시자
+
+    쓰기 직후 깨운 세션은 게시자가 아직 옛 스냅샷을 들고 있을 수 있으므로, 새 스냅샷이 게시되면(PUBLISHED_MARKER) 한 번 더 깨움
+    """
+
+    def __init__(self, data_dir: Path, poll_interval=POLL_INTERVAL, min_interval=MIN_WAKE_INTERVAL):
+        self.data_dir = data_dir
+        self.poll_interval = poll_interval
+        self.min_interval = min_interval
+
+        self.version = 0
+        self._signature = self._scan()
+        self._pending = False
+        self._last_wake = 0.0
+        self._sessions = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+        thread = threading.Thread(target=self._run, name="change-notifier", daemon=True)
+        thread.start()
+
+    def _scan(self):
+        """파일 이름/크기/수정 시각으로 만든 서명 (내용을 읽지 않음)"""
+        signature = []
+        for path in sorted(self.data_dir.glob("*.csv")) + [PUBLISHED_MARKER]:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signature.append((path.name, stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def bump(self):
+        """이벤트 writer가 직접 호출 - 다음 poll을 기다리지 않고 변경 알림"""
+        with self._lock:
+            self._pending = True
+        self._wakeup.set()
+
+    def subscribe(self, session_id: str):
+        with self._lock:
+            self._sessions.add(session_id)
+
+    def unsubscribe(self, session_id: str):
+        with self._lock:
+            self._sessions.discard(session_id)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+            signature = self._scan()
+            now = time.monotonic()
+            with self._lock:
+                if signature != self._signature:
+                    self._signature = signature
+                    self._pending = True
+
+                # 최소 간격 안에 들어온 변경은 pending으로 남겨 두었다가 한 번에 깨움
+                if not self._pending or (now - self._last_wake) < self.min_interval:
+                    continue
+
+                self._pending = False
+                self._last_wake = now
+                self.version += 1
+                sessions = list(self._sessions)
+
+            self._wake_sessions(sessions)
+
+    def _wake_sessions(self, session_ids):
+        session_mgr = _session_manager()
+        if session_mgr is None:
+            return
+
+        for session_id in session_ids:
+            info = session_mgr.get_active_session_info(session_id)
+            if info is None:
+                # 탭이 닫힌 세션 → 구독 해제
+                self.unsubscribe(session_id)
+                continue
+            try:
+                info.session.request_rerun(None)   # None = 직전 위젯 상태 그대로 rerun
+            except Exception as e:
+                print("[change_notifier] rerun 요청 실패:", repr(e))
+
+
+def _session_manager():
+    """세션을 깨우는 데 쓰는 Streamlit 내부 API (Runtime._session_mgr) - 없으면 None
+
+    공개 API 가 아니라 Streamlit 버전에 따라 없어질 수 있음 → 그때는 구독을 거절해 호출 측이 polling 으로 대체
+    """
+    if not runtime.exists():
+        return None
+    session_mgr = getattr(runtime.get_instance(), "_session_mgr", None)
+    if not callable(getattr(session_mgr, "get_active_session_info", None)):
+        return None
+    return session_mgr
+
+
+@st.cache_resource
+def get_notifier():
+    """서버 프로세스당 하나의 감시자"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return ChangeNotifier(DATA_DIR)
+
+
+def notify_change():
+    """CSV를 쓴 직후 호출 (같은 프로세스의 통계 세션을 바로 깨움)"""
+    get_notifier().bump()
+
+
+def mark_published():
+    """게시자가 바뀐 데이터로 스냅샷을 게시한 직후 호출 (다른 프로세스의 감시자도 다음 poll 에서 알아챔)"""
+    PUBLISHED_MARKER.parent.mkdir(parents=True, exist_ok=True)
+    PUBLISHED_MARKER.write_text(str(time.time_ns()))
+
+
+def subscribe_current_session() -> bool:
+    """현재 세션을 변경 알림 대상으로 등록. 실패하거나 세션을 깨울 수 없는 Streamlit 이면 False (호출 측에서 polling으로 대체)"""
+    ctx = get_script_run_ctx()
+    if ctx is None or _session_manager() is None:
+        return False
+    get_notifier().subscribe(ctx.session_id)
+    return True
+
+
+def unsubscribe_current_session():
+    """통계 페이지를 떠난 세션은 더 이상 깨우지 않음 (다른 페이지가 rerun 되는 것 방지)"""
+    ctx = get_script_run_ctx()
+    if ctx is None or not runtime.exists():
+        return
+    get_notifier().unsubscribe(ctx.session_id)
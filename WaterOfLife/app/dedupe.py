@@ -0,0 +1,43 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SeenSet:
+    """최근 본 토큰 집합 - ttl 초가 지나면 잊어버림 (같은 요청이 두 번 들어왔는지 확인용)
+
+    TTL 이 모두 같으므로 넣은 순서 = 만료 순서라서 앞에서부터만 지우면 됨
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 100_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._expires = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float):
+        while self._expires:
+            token, expires_at = next(iter(self._expires.items()))
+            if expires_at > now and len(self._expires) <= self.max_entries:
+                break
+            self._expires.popitem(last=False)
+
+    def add(self, token: str) -> bool:
+        """처음 보는 토큰이면 기록하고 True, 이미 본 토큰이면 False"""
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            if token in self._expires:
+                return False
+            self._expires[token] = now + self.ttl
+            return True
+
+    def __contains__(self, token: str) -> bool:
+        """이미 본(아직 잊지 않은) 토큰인지 - 기록하지는 않음"""
+        with self._lock:
+            self._purge(time.monotonic())
+            return token in self._expires
+
+    def __len__(self):
+        with self._lock:
+            return len(self._expires)
@@ -0,0 +1,102 @@
+import json
+
+import streamlit as st
+
+from images import APP_DIR, IMG_DIR, GALLERY_HEIGHT
+from memory_budget import track
+from perf import timed
+from recommender import CATEGORIES
+from static_assets import asset_url
+
+CATALOG_PATH = APP_DIR / "drink_catalog.json"
+
+# 블록 종류별 필수 필드
+BLOCK_FIELDS = {
+    "markdown": {"text"},
+    "caption": {"text"},
+    "divider": set(),
+    "image": {"src", "width"},
+    "gallery": {"images"},
+}
+
+
+def validate_catalog(data: dict) -> dict:
+    """카탈로그 구조 검사 - 문제가 있으면 한꺼번에 모아서 ValueError"""
+    categories = data.get("categories")
+    if not isinstance(categories, dict):
+        raise ValueError("drink_catalog.json: 'categories' 항목이 없습니다.")
+
+    problems = [f"'{c}' 카테고리 소개가 없습니다." for c in CATEGORIES if c not in categories]
+    for category, blocks in categories.items():
+        for i, block in enumerate(blocks):
+            where = f"{category}[{i}]"
+            kind = block.get("type")
+            if kind not in BLOCK_FIELDS:
+                problems.append(f"{where}: 알 수 없는 블록 종류 {kind!r}")
+                continue
+            missing = BLOCK_FIELDS[kind] - block.keys()
+            if missing:
+                problems.append(f"{where}: {kind} 블록에 {sorted(missing)} 필드가 없습니다.")
+            elif kind == "image" and not (IMG_DIR / block["src"]).exists():
+                problems.append(f"{where}: 이미지 파일 {block['src']} 이 없습니다.")
+
+    if problems:
+        raise ValueError("drink_catalog.json 오류:\n" + "\n".join(problems))
+    return categories
+
+
+def _gallery_html(sources, height: int) -> str:
+    img_tags = "".join(
+        f'<img src="{src}" loading="lazy" '
+        f'style="height:{height}px; border-radius:12px; flex:0 0 auto;">'
+        for src in sources
+    )
+    return f"""
+        <div class="h-scroll-gallery" style="
+            display: flex;
+            overflow-x: auto;
+            gap: 12px;
+            padding: 12px 0 6px 0;
+            scrollbar-width: thin;
+            border-bottom: 1px solid rgba(255,255,255,0.08);
+        ">
+            {img_tags}
+        </div>
+        """
+
+
+def _build_block(block: dict) -> tuple:
+    """JSON 블록 → 바로 그릴 수 있는 (종류, 내용, 옵션)"""
+    kind = block["type"]
+    if kind == "divider":
+        return ("markdown", "---", {})
+    if kind == "image":
+        # 내용 해시 이름의 정적 URL - 브라우저가 캐시하므로 다시 받지 않음
+        return ("image", asset_url(block["src"], width=block["width"]), {"width": block["width"]})
+    if kind == "gallery":
+        height = block.get("height", GALLERY_HEIGHT)
+        urls = [asset_url(name, height=height) for name in block["images"]]
+        # 아직 올리지 않은 사진은 건너뜀 (갤러리 전체가 깨지지 않도록)
+        return ("markdown", _gallery_html([u for u in urls if u], height), {"unsafe_allow_html": True})
+    return (kind, block["text"], {})
+
+
+@timed("load_catalog")
+@st.cache_resource(show_spinner=False)
+def load_catalog() -> dict:
+    """카탈로그를 읽고 검사한 뒤 카테고리별 블록을 미리 만들어 둠 (프로세스당 한 번)"""
+    data = json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
+    categories = validate_catalog(data)
+    return {
+        category: tuple(_build_block(block) for block in blocks)
+        for category, blocks in categories.items()
+    }
+
+
+track("drink_catalog", load_catalog)
+
+
+def render_category(category: str):
+    """추천 카테고리 소개를 화면에 출력"""
+    for kind, content, options in load_catalog().get(category, ()):
+        getattr(st, kind)(content, **options)
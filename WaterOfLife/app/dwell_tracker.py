@@ -0,0 +1,391 @@
+"""설문 완료 → 통계 진입 소요 시간을 이벤트를 쓸 때 기록 - 통계는 날짜별 분위수 스케치 + 구간 카운터만 합침
+
+워커마다 client 의 첫 survey_completed 시각을 메모리에 잠시 들고 있다가, 그 뒤 첫 stats_viewed 가 오면
+data/dwell/<shard>.log 에 "통계 진입 시각,소요 초,client_id" 를 한 줄 덧붙임
+설문 시각도 "s,설문 시각,client_id" 로 남겨, 워커가 재시작되면 새 프로세스가 이어받음 (load_pending)
+client 당 한 줄은 쓰는 쪽이 보장함 (이미 잰 client 는 다시 재지 않고, 재시작하면 소요 시간 줄로 잰 client 를 알아냄)
+그래서 읽는 쪽은 client 별 상태 없이 새로 붙은 줄만 읽어 날짜별 QuantileSketch 와 DWELL_BINS 구간 개수에 더함
+base.log 는 이 기록을 시작하기 전의 이벤트로 한 번 만든 것 (첫 줄의 기준 시각 이후 journal 만 더함).
+종료된 워커의 journal 은 시작할 때 base.log 에 합쳐 지움 (compact)
+"""
+import fcntl
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import perf
+from group_commit import GroupCommitLog, fsync_dir
+from quantile_sketch import QuantileSketch
+from settings import DATA_DIR
+
+DWELL_DIR = DATA_DIR / "dwell"
+BASE_PATH = DWELL_DIR / "base.log"
+SKETCH_ALPHA = 0.01        # 중앙값 상대 오차 1%
+PENDING_TTL = 86400.0      # 설문 후 이만큼 통계 진입이 없으면 잊음
+PENDING_MAX = 100_000      # 기다리는 client 수 상한 (넘으면 오래된 것부터 잊음)
+
+
+def _journal_path():
+    from event_store import shard_id   # event_store 가 이 모듈을 import 하므로 여기서
+    return DWELL_DIR / f"{shard_id()}.log"
+
+
+# ---------------------------- #
+#        기록 (이벤트를 쓸 때)
+# ---------------------------- #
+
+# 파생 데이터라(base.log 를 다시 만들면 복구) 매번 fsync 하지 않음
+_journal = GroupCommitLog("dwell", _journal_path, "interval", 5.0)
+_pending = OrderedDict()   # client_id → [설문 완료 시각, 이미 기록함] (설문 시각 순)
+_pending_lock = threading.Lock()
+_pending_loaded = False    # 다른(종료된) 워커가 남긴 설문 시각을 읽었는지
+
+
+def _expire(now: float):
+    while _pending:
+        _, (started, _) = next(iter(_pending.items()))
+        if len(_pending) <= PENDING_MAX and now - started < PENDING_TTL:
+            break
+        _pending.popitem(last=False)
+
+
+def load_pending():
+    """journal 들(compact 로 합친 base.log 포함)에 남은 최근 PENDING_TTL 안의 설문 시각을 이어받음 (프로세스당 한 번, 워밍업 또는 첫 기록 때)
+
+    설문 후 워커가 재시작되어도 새 워커에서 소요 시간을 잴 수 있고, 이미 잰 client 는 다시 재지 않음
+    (compact 는 잰 client 의 설문 시각 줄을 지우므로 소요 시간 줄의 시각 - 소요 초로 설문 시각을 되살림)
+    """
+    global _pending_loaded
+    with _pending_lock:
+        if _pending_loaded:
+            return
+        _pending_loaded = True
+        since = time.time() - PENDING_TTL
+        started, done = {}, {}   # client_id → 설문 시각 (timestamp)
+        for path in DWELL_DIR.glob("*.log"):
+            try:
+                lines = path.read_text("utf-8").splitlines()
+            except FileNotFoundError:
+                continue
+            for line in lines:
+                parts = line.split(",", 2)
+                if len(parts) < 3 or line.startswith("#"):
+                    continue
+                if parts[0] == "s":
+                    survey_time, found = datetime.fromisoformat(parts[1]).timestamp(), started
+                else:
+                    survey_time, found = datetime.fromisoformat(parts[0]).timestamp() - int(parts[1]), done
+                if survey_time >= since:   # PENDING_TTL 안의 client 만 (메모리는 최근 설문 수에 비례)
+                    found.setdefault(parts[2], survey_time)
+        entries = {client_id: [survey_time, False] for client_id, survey_time in started.items()}
+        for client_id, survey_time in done.items():
+            entries.setdefault(client_id, [survey_time, True])[1] = True
+        for client_id, entry in sorted(entries.items(), key=lambda item: item[1][0]):
+            if client_id not in _pending:
+                _pending[client_id] = entry
+        _expire(time.time())
+
+
+def _append(line: str):
+    try:
+        _journal.append(line.encode("utf-8"))
+    except OSError as e:
+        # 체류 시간 기록 실패가 이벤트 기록까지 막지 않도록
+        print("[dwell_tracker] 기록 실패:", repr(e))
+
+
+def record(client_id: str, event_name: str):
+    """첫 survey_completed 시각을 기억하고, 그 뒤 첫 stats_viewed 에서 소요 시간을 journal 에 한 줄
+
+    이미 잰 client 는 설문 후 PENDING_TTL 동안 기억해 다시 재지 않음 (재시작하면 load_pending 이 소요 시간 줄로 이어받음).
+    그보다 오래 지나(또는 PENDING_MAX 를 넘어 잊힌 뒤) 같은 세션에서 다시 설문하면 새 표본으로 한 줄 더 생김
+    """
+    if event_name not in ("survey_completed", "stats_viewed") or not client_id or "," in client_id or "\n" in client_id:
+        return
+    load_pending()
+    now = time.time()
+    stamp = datetime.fromtimestamp(now).isoformat()
+    with _pending_lock:
+        _expire(now)
+        entry = _pending.get(client_id)
+        if event_name == "survey_completed":
+            if entry is not None:
+                return
+            _pending[client_id] = [now, False]
+        elif entry is None or entry[1]:
+            return
+        else:
+            entry[1] = True
+    if event_name == "survey_completed":
+        _append(f"s,{stamp},{client_id}\n")
+    else:
+        _append(f"{stamp},{int(now - entry[0])},{client_id}\n")
+
+
+# ---------------------------- #
+#        읽기 (통계 계산)
+# ---------------------------- #
+
+class _Day:
+    """하루치 소요 시간 - 분위수 스케치 + DWELL_BINS 구간별 개수 (크기 고정)"""
+    __slots__ = ("sketch", "buckets")
+
+    def __init__(self, bins: int):
+        self.sketch = QuantileSketch(SKETCH_ALPHA)
+        self.buckets = [0] * bins
+
+
+class DwellIndex:
+    """모든 journal 을 합친 날짜(ordinal) → _Day
+
+    파일별로 읽은 위치를 기억해 refresh 때 새로 붙은 줄만 읽음. 중복은 쓰는 쪽에서 걸렀으므로 줄마다 그대로 더함
+    base.log 첫 줄의 기준 시각 이전 journal 줄은 base 에 이미 들어 있으므로 건너뜀
+    """
+
+    def __init__(self, directory=DWELL_DIR):
+        from stats_core import DWELL_BINS
+
+        self.directory = directory
+        self._edges = DWELL_BINS[1:-1]   # 마지막 구간은 끝이 없음 ("10분 이상")
+        self._days = {}
+        self._offsets = {}   # 파일 이름 → (inode, 읽은 바이트 수)
+        self._cutoff = None  # base.log 의 기준 시각 (ISO 문자열)
+        self._lock = threading.Lock()
+        self._version = 0    # 새 줄을 합칠 때마다 +1
+        self._summaries = {}  # start_day → (version, 결과)
+
+    def _reset(self):
+        self._days, self._offsets, self._cutoff = {}, {}, None
+        self._version += 1
+
+    def _add(self, stats_time: str, seconds: int):
+        day = date.fromisoformat(stats_time[:10]).toordinal()
+        entry = self._days.get(day)
+        if entry is None:
+            entry = self._days[day] = _Day(len(self._edges) + 1)
+        entry.sketch.add(seconds)
+        entry.buckets[bisect_right(self._edges, seconds)] += 1
+
+    def _apply(self, data: bytes, is_base: bool):
+        for line in data.decode("utf-8").splitlines():
+            if line.startswith("#"):
+                self._cutoff = line[1:].strip()
+                continue
+            if line.startswith("s,"):
+                continue   # 설문 시각 (기록하는 쪽만 씀)
+            stats_time, seconds = line.split(",", 2)[:2]   # client_id 가 없는 예전 base.log 줄도 읽음
+            if not is_base and self._cutoff is not None and stats_time <= self._cutoff:
+                continue
+            self._add(stats_time, int(seconds))
+
+    def refresh(self):
+        with self._lock, perf.span("dwell_tracker.refresh"):
+            stats = {}
+            for path in sorted(self.directory.glob("*.log"), key=lambda path: path != BASE_PATH):   # base 먼저 (기준 시각)
+                try:
+                    stats[path] = path.stat()
+                except FileNotFoundError:
+                    continue
+            if self._replaced(stats):
+                self._reset()   # 합계라 같은 줄을 다시 더하면 중복 → 하나라도 바뀌었으면 처음부터
+            for path, stat in stats.items():
+                self._read_new(path, stat)
+
+    def _replaced(self, stats: dict) -> bool:
+        """지워지거나 다시 만들어진(inode 변경, 크기 감소) 파일이 있는지"""
+        current = {path.name: stat for path, stat in stats.items()}
+        for name, (inode, offset) in self._offsets.items():
+            stat = current.get(name)
+            if stat is None or stat.st_ino != inode or stat.st_size < offset:
+                return True
+        return False
+
+    def _read_new(self, path, stat):
+        inode, offset = self._offsets.get(path.name, (stat.st_ino, 0))
+        if stat.st_size == offset:
+            return
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(stat.st_size - offset)
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1   # 쓰는 중인 마지막 줄은 다음에
+        self._apply(data[:end], path == BASE_PATH)
+        self._offsets[path.name] = (inode, offset + end)
+        self._version += 1
+
+    def summary(self, start_day: int = None) -> tuple:
+        """(합친 스케치, 구간별 개수) - start_day 이후 날짜만"""
+        with self._lock:
+            cached = self._summaries.get(start_day)
+            if cached is not None and cached[0] == self._version:
+                return cached[1]
+            sketch, buckets = QuantileSketch(SKETCH_ALPHA), [0] * (len(self._edges) + 1)
+            for day, entry in self._days.items():
+                if start_day is None or day >= start_day:
+                    sketch.merge(entry.sketch)
+                    buckets = [a + b for a, b in zip(buckets, entry.buckets)]
+            self._summaries = {key: value for key, value in self._summaries.items() if value[0] == self._version}
+            self._summaries[start_day] = (self._version, (sketch, buckets))
+            return sketch, buckets
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _get_index() -> DwellIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DwellIndex()   # stats_core(pandas) 는 통계를 읽을 때만 import
+        return _index
+
+
+def summary(period_days: int = None):
+    """최근 period_days 일(None 이면 전체)의 체류 시간 통계 - stats_core.merge_partials 의 dwell_* 항목과 같은 모양
+
+    base.log 가 아직 없으면 None - 호출 측은 이벤트에서 직접 계산
+    """
+    import pandas as pd
+    from stats_core import DWELL_LABELS
+
+    if not BASE_PATH.exists():
+        return None
+    index = _get_index()
+    index.refresh()
+    start_day = date.today().toordinal() - period_days if period_days else None
+    sketch, buckets = index.summary(start_day)
+
+    result = {"dwell_sessions": sketch.count}
+    if sketch.count:
+        result["dwell_summary"] = pd.Series({
+            "개수": float(sketch.count),
+            "평균(초)": sketch.mean,
+            "중앙값(초)": sketch.quantile(0.5),
+            "최대(초)": float(sketch.max),
+        }).to_frame("값")
+        result["dwell_buckets"] = pd.DataFrame({
+            "구간": pd.Categorical(DWELL_LABELS, categories=DWELL_LABELS, ordered=True),
+            "세션 수": buckets,
+        })
+    return result
+
+
+# ---------------------------- #
+#        base.log (처음 한 번)
+# ---------------------------- #
+
+def rebuild():
+    """지금까지의 이벤트(보관본 포함)로 base.log 를 새로 만듦 - 첫 설문 완료 이후 첫 통계 진입만 (client 당 한 줄)"""
+    import pandas as pd
+    from event_store import read_stream
+
+    cutoff = datetime.now().isoformat()   # 이 시각 이후의 통계 진입은 journal 에서
+    events = read_stream("events", include_archive=True)
+    lines = []
+    if not events.empty and "timestamp" in events.columns:
+        events = events.dropna(subset=["client_id"])
+        events = events.assign(timestamp=pd.to_datetime(events["timestamp"], format="ISO8601"))
+        survey_first = events[events["event"] == "survey_completed"].groupby("client_id")["timestamp"].min()
+        stats = events[events["event"] == "stats_viewed"][["client_id", "timestamp"]]
+        stats = stats.join(survey_first.rename("survey_time"), on="client_id", how="inner")
+        stats = stats[(stats["timestamp"] >= stats["survey_time"]) & (stats["timestamp"] <= pd.Timestamp(cutoff))]
+        first = stats.sort_values("timestamp").drop_duplicates("client_id")
+        seconds = (first["timestamp"] - first["survey_time"]).dt.total_seconds().astype(int)
+        lines = [
+            f"{ts.isoformat()},{sec},{client_id}\n"
+            for ts, sec, client_id in zip(first["timestamp"], seconds, first["client_id"].astype(str))
+        ]
+
+    _write_base(f"# {cutoff}\n{''.join(lines)}".encode("utf-8"))
+    print(f"[dwell_tracker] base.log 생성 ({len(lines)}줄)")
+
+
+def _write_base(data: bytes):
+    DWELL_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = BASE_PATH.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(BASE_PATH)
+    fsync_dir(DWELL_DIR)
+
+
+@contextmanager
+def _base_locked():
+    """base.log 를 만들거나 바꾸는 동안 (여러 워커가 동시에 시작해도 하나씩)"""
+    DWELL_DIR.mkdir(parents=True, exist_ok=True)
+    with open(DWELL_DIR / ".base.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def ensure_base():
+    """base.log 가 없으면 한 번 만듦 (여러 워커가 동시에 시작해도 하나만)"""
+    if BASE_PATH.exists():
+        return
+    with _base_locked():
+        if not BASE_PATH.exists():
+            rebuild()
+
+
+def _merged_base(base: list, journals: list) -> list:
+    """base.log 줄 + 종료된 워커 journal 줄 → 새 base.log 줄 (DwellIndex 가 읽는 것과 같은 규칙으로 미리 걸러 둠)
+
+    client 마다 첫 소요 시간 한 줄, 기준 시각 이전 journal 줄 제외, 설문 시각은 PENDING_TTL 안이고 아직 안 잰 client 만
+    """
+    header = [line for line in base if line.startswith("#")][:1]
+    cutoff = header[0][1:].strip() if header else None
+    since = datetime.fromtimestamp(time.time() - PENDING_TTL).isoformat()
+    samples, starts, seen = [], {}, set()
+    for is_base, lines in [(True, base)] + [(False, lines) for lines in journals]:
+        for line in lines:
+            if line.startswith("#"):
+                continue
+            parts = line.split(",", 2)
+            if parts[0] == "s":
+                if len(parts) == 3 and parts[1] >= since:
+                    starts.setdefault(parts[2], line)
+                continue
+            if not is_base and cutoff is not None and parts[0] <= cutoff:
+                continue
+            if len(parts) == 3:
+                if parts[2] in seen:
+                    continue
+                seen.add(parts[2])
+            samples.append(line)
+    return header + samples + [line for client_id, line in starts.items() if client_id not in seen]
+
+
+def compact():
+    """종료된 워커의 journal 을 base.log 에 합치고 지움 - 재시작할 때마다 journal 이 쌓여 첫 refresh 가 느려지지 않도록
+
+    base.log 를 먼저 바꾼 뒤 지우므로 중간에 죽어도 잃는 줄은 없음. 남은 journal 은 다음 compact 때 client 중복으로 빠짐
+    (그 사이 다른 워커의 통계에는 두 번 더해질 수 있음). client 중복을 거르는 집합은 합치는 동안만 있음
+    """
+    from event_store import dead_shard_files
+
+    with _base_locked():
+        journals = dead_shard_files(DWELL_DIR)
+        if not journals or not BASE_PATH.exists():
+            return
+        journal_lines = []
+        for path in journals:
+            data = path.read_text("utf-8")
+            journal_lines.append(data[:data.rfind("\n") + 1].splitlines())   # 끊긴 마지막 줄 제외
+        lines = _merged_base(BASE_PATH.read_text("utf-8").splitlines(), journal_lines)
+        _write_base("".join(line + "\n" for line in lines).encode("utf-8"))
+        for path in journals:
+            path.unlink()
+        fsync_dir(DWELL_DIR)
+    print(f"[dwell_tracker] 종료된 워커 journal {len(journals)}개를 base.log 에 합침")
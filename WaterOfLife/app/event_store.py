@@ -0,0 +1,536 @@
+from __future__ import annotations
+
+import csv
+import fcntl
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import socket
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from change_notifier import notify_change
+from dedupe import SeenSet
+from group_commit import GroupCommitLog, drop_torn_tail, fsync_dir
+from perf import timed
+from rate_limit import RateLimiter
+from settings import DATA_DIR, get_setting
+import dwell_tracker
+import visit_tracker
+
+if TYPE_CHECKING:
+    import pandas as pd   # 쓰기 경로(홈/설문 첫 화면)에서는 pandas 를 import 하지 않음
+
+SEGMENT_DIR = DATA_DIR / "segments"
+ARCHIVE_DIR = DATA_DIR / "archive"
+MANIFEST_PATH = SEGMENT_DIR / "manifest.json"
+
+# 스트림 이름 → 워커별 라이브 파일 (data/<stream>-<host>-<pid>.csv)
+# 예전 단일 파일(data/<stream>.csv)도 읽기/로테이션 대상에 포함
+STREAMS = ("events", "survey_results")
+
+ROTATE_MAX_BYTES = get_setting("EVENT_ROTATE_MAX_BYTES", 5 * 1024 * 1024)   # 이 크기를 넘으면 세그먼트로 분리
+ROTATE_DAILY = get_setting("EVENT_ROTATE_DAILY", True)                      # 날짜가 바뀌면 세그먼트로 분리
+RETENTION_DAYS = get_setting("EVENT_RETENTION_DAYS", 30)                    # 이 기간이 지난 세그먼트는 압축 보관
+ARCHIVE_RETENTION_DAYS = get_setting("EVENT_ARCHIVE_RETENTION_DAYS", 0)     # 0 = 보관본 영구 유지
+SHARD_NAME = get_setting("EVENT_SHARD_ID", "")                              # 비워 두면 <host>-<pid>
+SUBMISSION_TTL_SECONDS = get_setting("SUBMISSION_TTL_SECONDS", 600)          # 같은 제출 토큰을 중복으로 보는 시간
+
+# 쓰기 내구성 (group_commit.POLICIES) - write / batch(기본, 동시 쓰기를 묶어 fsync 한 번) / interval(fsync 를 주기적으로)
+EVENT_DURABILITY = get_setting("EVENT_DURABILITY", "batch")
+EVENT_FSYNC_INTERVAL = get_setting("EVENT_FSYNC_INTERVAL", 1.0)   # interval 정책의 fsync 주기 (초)
+
+# 이 프로세스에서 이미 기록한 제출 토큰 (더블 클릭/재실행으로 같은 제출이 다시 들어오면 버림)
+_submissions = SeenSet(SUBMISSION_TTL_SECONDS)
+
+# 쓰기 속도 제한 (초당 개수, 0 = 제한 없음) - client 는 15초 분량, 전체는 2초 분량까지 몰아서 허용
+EVENT_RATE_PER_CLIENT = get_setting("EVENT_RATE_PER_CLIENT", 2.0)
+EVENT_RATE_GLOBAL = get_setting("EVENT_RATE_GLOBAL", 200.0)
+SURVEY_RATE_PER_CLIENT = get_setting("SURVEY_RATE_PER_CLIENT", 0.2)
+SURVEY_RATE_GLOBAL = get_setting("SURVEY_RATE_GLOBAL", 50.0)
+
+_limiters = {
+    "events": RateLimiter("events", EVENT_RATE_PER_CLIENT, EVENT_RATE_PER_CLIENT * 15,
+                          EVENT_RATE_GLOBAL, EVENT_RATE_GLOBAL * 2),
+    "survey_results": RateLimiter("survey_results", SURVEY_RATE_PER_CLIENT, SURVEY_RATE_PER_CLIENT * 15,
+                                  SURVEY_RATE_GLOBAL, SURVEY_RATE_GLOBAL * 2),
+}
+
+
+def _parse_rates(text: str) -> dict:
+    """"home_viewed=0.2,stats_viewed=0.5" → {"home_viewed": 0.2, "stats_viewed": 0.5}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+# 이벤트 종류별 표본 비율 - 적힌 종류만 일부 client 의 이벤트만 기록 (나머지 종류는 전부 기록)
+EVENT_SAMPLE_RATES = _parse_rates(get_setting("EVENT_SAMPLE_RATES", ""))
+NEVER_SAMPLED = ("survey_completed", "purchase_clicked")   # 전환 계산의 분자 - 항상 전부 기록
+
+
+# ---------------------------- #
+#        경로 / 잠금
+# ---------------------------- #
+
+def shard_id() -> str:
+    """이 워커 프로세스의 샤드 이름 (fork 뒤에도 맞도록 매번 pid 확인)"""
+    return SHARD_NAME or f"{socket.gethostname()}-{os.getpid()}"
+
+
+def live_path(stream: str) -> Path:
+    """이 프로세스가 쓰는 라이브 샤드 파일"""
+    return DATA_DIR / f"{stream}-{shard_id()}.csv"
+
+
+def live_paths(stream: str) -> list:
+    """모든 워커의 라이브 샤드 + 예전 단일 파일"""
+    legacy = DATA_DIR / f"{stream}.csv"
+    paths = sorted(DATA_DIR.glob(f"{stream}-*.csv"))
+    return ([legacy] if legacy.exists() else []) + paths
+
+
+def _is_orphan(path: Path, stream: str) -> bool:
+    """더 이상 쓰는 프로세스가 없는 라이브 파일 (예전 단일 파일, 같은 호스트의 종료된 워커)"""
+    shard = path.stem[len(stream) + 1:]
+    return not shard or is_dead_shard(shard)
+
+
+def is_dead_shard(shard: str) -> bool:
+    """같은 호스트의 종료된 워커 샤드인지 (방문일/체류 시간 journal 정리에도 사용)"""
+    host, _, pid = shard.rpartition("-")
+    if host != socket.gethostname() or not pid.isdigit() or shard == shard_id():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+def dead_shard_files(directory: Path, pattern: str = "*.log") -> list:
+    """이름이 종료된 워커 샤드인 파일 (visits/dwell journal 처럼 샤드 이름 그대로인 파일)"""
+    return [path for path in sorted(directory.glob(pattern)) if is_dead_shard(path.stem)]
+
+
+# 샤드는 이 프로세스만 쓰므로 로테이션 확인은 스레드 잠금으로 충분 (워커끼리는 경합 없음)
+_append_locks = {stream: threading.Lock() for stream in STREAMS}
+
+# 스트림별 라이브 샤드 writer - 동시에 들어온 행을 한 번의 write + fsync 로 묶음
+_logs = {
+    stream: GroupCommitLog(stream, lambda stream=stream: live_path(stream), EVENT_DURABILITY, EVENT_FSYNC_INTERVAL)
+    for stream in STREAMS
+}
+
+
+@contextmanager
+def _locked(name: str):
+    """여러 Streamlit 프로세스가 같은 파일(manifest 등)을 고치지 않도록 파일 잠금"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    with open(DATA_DIR / f".{name}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# ---------------------------- #
+#        MANIFEST
+# ---------------------------- #
+
+def load_manifest() -> dict:
+    if not MANIFEST_PATH.exists():
+        return {"segments": []}
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest: dict):
+    SEGMENT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST_PATH.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())   # 내용이 디스크에 간 뒤에 이름을 바꿔야 장애 후에도 빈 manifest 가 되지 않음
+    tmp.replace(MANIFEST_PATH)
+    fsync_dir(SEGMENT_DIR)
+
+
+# ---------------------------- #
+#        WRITE
+# ---------------------------- #
+
+def _read_header_and_first(path: Path):
+    """라이브 파일의 헤더와 첫 행 timestamp (파일 전체를 읽지 않음)"""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        first = next(reader, None)
+    first_ts = None
+    if header and first and "timestamp" in header:
+        first_ts = first[header.index("timestamp")]
+    return header, first_ts
+
+
+def _needs_rotation(path: Path, columns) -> bool:
+    if not path.exists() or path.stat().st_size == 0:
+        return False
+    header, first_ts = _read_header_and_first(path)
+    if header != list(columns):
+        # 컬럼 구성이 바뀌면 append 가 불가능하므로 새 세그먼트 시작
+        return True
+    if path.stat().st_size >= ROTATE_MAX_BYTES:
+        return True
+    if ROTATE_DAILY and first_ts and first_ts[:10] < datetime.now().date().isoformat():
+        return True
+    return False
+
+
+def _csv_line(values) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue().encode("utf-8")
+
+
+def append_row(stream: str, row: dict):
+    """라이브 파일 끝에 한 줄 추가 (기존 파일을 다시 읽고 쓰지 않음)
+
+    EVENT_DURABILITY 만큼 디스크에 반영된 뒤 반환 - 기본(batch)은 fsync 까지
+    """
+    path = live_path(stream)
+    columns = list(row.keys())
+
+    with _append_locks[stream]:
+        if _needs_rotation(path, columns):
+            with _logs[stream].paused(), _locked("manifest"):
+                _rotate_locked(stream, path)
+                _rotate_orphans_locked(stream)
+                _apply_retention_locked(stream)
+
+    # 잠금 밖에서 - 그래야 동시에 들어온 행이 한 번의 write + fsync 로 묶임
+    _logs[stream].append(_csv_line([row[c] for c in columns]), header=_csv_line(columns))
+    notify_change()
+
+
+def _is_repeat(stream: str, token) -> bool:
+    """이미 기록한 token 인지 - 기록은 _mark_recorded 가 (속도 제한에 걸리거나 쓰기에 실패한 제출은 다시 시도할 수 있도록)"""
+    return token is not None and f"{stream}:{token}" in _submissions
+
+
+def _mark_recorded(stream: str, token):
+    if token is not None:
+        _submissions.add(f"{stream}:{token}")
+
+
+def sample_rate(event_name: str) -> float:
+    if event_name in NEVER_SAMPLED:
+        return 1.0
+    return EVENT_SAMPLE_RATES.get(event_name, 1.0)
+
+
+def sample_unit(client_id: str) -> float:
+    """client_id 해시 → [0, 1) - client 마다 고정이라 한 사람의 이벤트는 모두 남거나 모두 빠짐"""
+    digest = hashlib.blake2b(str(client_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+@timed("log_event")
+def log_event(client_id: str, event_name: str, token: str = None, arm: str = ""):
+    """token 이 있으면 같은 token 의 두 번째 기록부터는 버림, 속도 제한에 걸려도 버림 (True = 기록함)
+
+    표본 대상 이벤트는 표본에 든 client 것만 기록하고 weight(= 1/표본 비율) 를 함께 남김
+    속도 제한에 걸린 이벤트는 방문일/체류 기록도 남기지 않음 (크롤러가 journal 과 메모리를 키우지 못하도록)
+    """
+    rate = sample_rate(event_name)
+    sampled_out = rate < 1.0 and sample_unit(client_id) >= rate
+    if not _limiters["events"].allow(client_id):   # 표본에서 빠진 이벤트도 아래 방문일/체류 기록을 쓰므로 함께 제한
+        return False
+    if not sampled_out and _is_repeat("events", token):
+        return False
+    visit_tracker.record(client_id)   # 표본에서 빠진 이벤트도 방문일은 남김 → 재방문율은 추정이 아닌 정확한 값
+    dwell_tracker.record(client_id, event_name)   # 체류 시간도 마찬가지
+    if sampled_out:
+        return False
+    append_row("events", {
+        "timestamp": datetime.now().isoformat(),
+        "client_id": client_id,   # 🔥 누가 했는지
+        "event": event_name,      # "survey_completed" / "stats_viewed"
+        "arm": arm,               # A/B 실험 그룹 (experiments.py, 실험이 없으면 빈 값)
+        "weight": f"{1 / rate:g}",   # 통계에서 표본 → 전체 추정용 (표본이 아니면 1)
+    })
+    _mark_recorded("events", token)
+    return True
+
+
+# 통계용
+@timed("save_result")
+def save_result(companion, mood, abv, taste_pref, food, recommended, token: str = None, client_id: str = ""):
+    """token 이 있으면 같은 token 의 두 번째 저장부터는 버림, 속도 제한에 걸려도 버림 (True = 저장함)"""
+    if not _limiters["survey_results"].allow(client_id) or _is_repeat("survey_results", token):
+        return False
+    append_row("survey_results", {
+        "timestamp": datetime.now().isoformat(),
+        "client_id": client_id,   # 추천 → 구매 클릭 연결용 (events 의 client_id 와 같음)
+        "companion": companion,
+        "mood": mood,
+        "abv": abv,
+        "taste_pref": taste_pref,
+        "food": food,
+        "recommended": recommended,
+    })
+    _mark_recorded("survey_results", token)
+    return True
+
+
+# ---------------------------- #
+#        ROTATION / RETENTION
+# ---------------------------- #
+
+def _rotate_locked(stream: str, path: Path):
+    """라이브 파일 하나를 세그먼트로 옮기고 manifest 에 기록 (manifest 잠금 안에서 호출)"""
+    import pandas as pd
+
+    drop_torn_tail(path)   # 종료된 워커가 쓰다 만 줄
+    df = pd.read_csv(path) if path.stat().st_size else pd.DataFrame()
+    if df.empty:
+        path.unlink()
+        return
+
+    SEGMENT_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    segment = SEGMENT_DIR / f"{path.stem}-{stamp}.csv"
+    path.replace(segment)
+    fsync_dir(SEGMENT_DIR)
+    fsync_dir(DATA_DIR)
+
+    manifest = load_manifest()
+    manifest["segments"].append(_segment_entry(stream, segment, df))
+    _save_manifest(manifest)
+
+
+def _segment_entry(stream: str, segment: Path, df) -> dict:
+    import pandas as pd
+
+    timestamps = df["timestamp"].astype(str) if "timestamp" in df.columns else pd.Series(dtype=str)
+    return {
+        "stream": stream,
+        "file": str(segment.relative_to(DATA_DIR)),
+        "start": timestamps.min() if len(timestamps) else None,
+        "end": timestamps.max() if len(timestamps) else None,
+        "rows": len(df),
+        "archived": False,
+    }
+
+
+def _rotate_orphans_locked(stream: str):
+    """종료된 워커가 남긴 샤드도 세그먼트로 정리 (그대로 두면 보관 정책이 적용되지 않음)"""
+    for path in live_paths(stream):
+        if path.stat().st_size and _is_orphan(path, stream):
+            _rotate_locked(stream, path)
+
+
+def _apply_retention_locked(stream: str):
+    """보관 기간이 지난 세그먼트는 gzip 으로 압축해 archive/ 로 이동"""
+    now = datetime.now()
+    hot_cutoff = (now - timedelta(days=RETENTION_DAYS)).isoformat()
+    drop_cutoff = (now - timedelta(days=ARCHIVE_RETENTION_DAYS)).isoformat() if ARCHIVE_RETENTION_DAYS else None
+
+    manifest = load_manifest()
+    kept = []
+    obsolete = []   # manifest 를 저장한 뒤에 지움 (그 전에 죽어도 manifest 가 가리키는 파일은 남아 있도록)
+    for seg in manifest["segments"]:
+        if seg["stream"] != stream or seg["end"] is None:
+            kept.append(seg)
+            continue
+
+        src = DATA_DIR / seg["file"]
+        if not seg["archived"] and seg["end"] < hot_cutoff:
+            ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+            dst = ARCHIVE_DIR / (src.name + ".gz")
+            with open(src, "rb") as f_in, open(dst, "wb") as raw:
+                with gzip.open(raw, "wb") as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+                raw.flush()
+                os.fsync(raw.fileno())
+            fsync_dir(ARCHIVE_DIR)
+            obsolete.append(src)
+            seg["file"] = str(dst.relative_to(DATA_DIR))
+            seg["archived"] = True
+            src = dst
+
+        if seg["archived"] and drop_cutoff and seg["end"] < drop_cutoff:
+            obsolete.append(src)
+            continue
+        kept.append(seg)
+
+    manifest["segments"] = kept
+    _save_manifest(manifest)
+    for path in obsolete:
+        path.unlink(missing_ok=True)
+
+
+def rotate(stream: str):
+    """수동 로테이션 (관리/배치용) - 이 프로세스의 샤드 + 주인 없는 샤드"""
+    with _append_locks[stream], _logs[stream].paused(), _locked("manifest"):
+        if live_path(stream).exists():
+            _rotate_locked(stream, live_path(stream))
+        _rotate_orphans_locked(stream)
+        _apply_retention_locked(stream)
+
+
+def _adopt_unlisted_segments_locked():
+    """세그먼트로 옮긴 직후 manifest 저장 전에 죽었으면 그 파일이 manifest 에 없음 → 다시 등록"""
+    import pandas as pd
+
+    if not SEGMENT_DIR.exists():
+        return
+    listed = {seg["file"] for seg in load_manifest()["segments"]}
+    adopted = []
+    for segment in sorted(SEGMENT_DIR.glob("*.csv")):
+        stream = next((s for s in STREAMS if segment.name.startswith(f"{s}-")), None)
+        if stream is None or str(segment.relative_to(DATA_DIR)) in listed:
+            continue
+        df = pd.read_csv(segment) if segment.stat().st_size else pd.DataFrame()
+        adopted.append(_segment_entry(stream, segment, df))
+    if adopted:
+        manifest = load_manifest()
+        manifest["segments"] += adopted
+        _save_manifest(manifest)
+        print(f"[event_store] manifest 에 빠진 세그먼트 {len(adopted)}개 다시 등록")
+
+
+def recover():
+    """시작 시 정리 - 종료된 워커 샤드의 끊긴 마지막 줄 제거 + manifest 에 빠진 세그먼트 등록"""
+    with _locked("manifest"):
+        for stream in STREAMS:
+            for path in live_paths(stream):
+                if _is_orphan(path, stream):
+                    drop_torn_tail(path)
+        _adopt_unlisted_segments_locked()
+
+
+# ---------------------------- #
+#        READ
+# ---------------------------- #
+
+def data_signature() -> tuple:
+    """라이브 파일 + manifest + 방문일/체류 journal 의 크기/수정 시각 - 내용이 바뀌었는지 캐시 키로 사용
+
+    표본에서 빠진 이벤트는 CSV 에는 없고 journal 에만 남으므로 journal 도 함께 봄
+    """
+    journals = sorted(visit_tracker.VISITS_DIR.glob("*.log")) + sorted(dwell_tracker.DWELL_DIR.glob("*.log"))
+    signature = []
+    for path in [p for s in STREAMS for p in live_paths(s)] + [MANIFEST_PATH] + journals:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        signature.append((f"{path.parent.name}/{path.name}", stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def _overlaps(seg: dict, start, end) -> bool:
+    if seg["start"] is None:
+        return True
+    if start is not None and seg["end"] < start:
+        return False
+    if end is not None and seg["start"] > end:
+        return False
+    return True
+
+
+def segments_for(stream: str, start=None, end=None, include_archive=False):
+    """요청 구간과 겹치는 세그먼트 파일 목록 (manifest 만 보고 결정)"""
+    start = start.isoformat() if isinstance(start, datetime) else start
+    end = end.isoformat() if isinstance(end, datetime) else end
+    return [
+        DATA_DIR / seg["file"]
+        for seg in load_manifest()["segments"]
+        if seg["stream"] == stream
+        and (include_archive or not seg["archived"])
+        and _overlaps(seg, start, end)
+    ]
+
+
+# 최근 병합 순서 (조각 파일 크기/수정 시각이 같으면 다시 정렬하지 않음)
+_merge_cache = {}
+_MERGE_CACHE_SIZE = 8
+
+
+def _read_piece(path: Path, live: bool = False):
+    """(파일 키, DataFrame) - 키는 읽기 전에 잡음. 그 사이 로테이션으로 사라지면 None
+
+    라이브 샤드는 다른 프로세스가 쓰는 중일 수 있으므로 마지막 줄바꿈까지만 읽음
+    """
+    import pandas as pd
+
+    try:
+        stat = path.stat()
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        if not live:
+            return key, pd.read_csv(path)
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    data = data[:data.rfind(b"\n") + 1]
+    return key, pd.read_csv(io.BytesIO(data)) if data else pd.DataFrame()
+
+
+def _merge_order(key, frames):
+    """각 조각은 이미 시간순이므로 timestamp 기준 k-way 병합 순서만 계산
+
+    numpy 의 stable 정렬(timsort)은 정렬된 구간(run)을 찾아 병합하므로 조각 수 k 에 대해 O(n log k)
+    """
+    import numpy as np
+    import pandas as pd
+
+    order = _merge_cache.get(key)
+    if order is None or len(order) != sum(len(f) for f in frames):   # 키를 잡은 뒤 파일이 늘어난 경우
+        ts = np.concatenate([
+            pd.to_datetime(f["timestamp"], format="ISO8601").to_numpy("datetime64[ns]").view("int64")
+            for f in frames
+        ])
+        order = np.argsort(ts, kind="stable")
+        if len(_merge_cache) >= _MERGE_CACHE_SIZE:
+            _merge_cache.pop(next(iter(_merge_cache)))
+        _merge_cache[key] = order
+    return order
+
+
+def read_stream(stream: str, start=None, end=None, include_archive=False) -> pd.DataFrame:
+    """세그먼트 + 모든 워커의 라이브 샤드를 시간순으로 합쳐서 읽기. start/end 가 있으면 해당 구간만"""
+    import pandas as pd
+
+    paths = [(p, False) for p in segments_for(stream, start, end, include_archive) if p.exists()]
+    paths += [(p, True) for p in live_paths(stream)]
+
+    pieces = [piece for piece in (_read_piece(*p) for p in paths) if piece and not piece[1].empty]
+    if not pieces:
+        return pd.DataFrame()
+
+    frames = [f for _, f in pieces]
+    df = pd.concat(frames, ignore_index=True)
+    if len(frames) > 1 and all("timestamp" in f.columns for f in frames):
+        order = _merge_order(tuple(key for key, _ in pieces), frames)
+        df = df.take(order).reset_index(drop=True)
+
+    if "timestamp" in df.columns and (start is not None or end is not None):
+        ts = pd.to_datetime(df["timestamp"])
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= ts >= pd.Timestamp(start)
+        if end is not None:
+            mask &= ts <= pd.Timestamp(end)
+        df = df[mask].reset_index(drop=True)
+    return df
@@ -0,0 +1,104 @@
+import fcntl
+import hashlib
+import json
+from pathlib import Path
+
+from recommender import WEIGHTS, load_weights
+from settings import DATA_DIR, get_setting
+
+# 실험 설정 JSON - 비워 두면 실험 없음 (모두 현재 점수표)
+# {"name": "tuned-2025-06", "arms": [{"name": "control", "share": 50},
+#                                    {"name": "tuned", "share": 50, "weights_file": "weights.json"}]}
+EXPERIMENT_FILE = get_setting("EXPERIMENT_FILE", "")
+EXPERIMENT_DIR = DATA_DIR / "experiments"
+BUCKETS = 10_000
+
+# 실험별로 세는 이벤트 (설문 완료 → 구매 클릭)
+FUNNEL_EVENTS = ("survey_completed", "purchase_clicked")
+
+
+def _load_experiment(path: str):
+    if not path:
+        return None
+    base = Path(path).resolve().parent
+    with open(path, encoding="utf-8") as f:
+        experiment = json.load(f)
+
+    total = sum(arm["share"] for arm in experiment["arms"])
+    bounds, weights, upper = [], {}, 0
+    for arm in experiment["arms"]:
+        upper += arm["share"]
+        bounds.append((upper * BUCKETS // total, arm["name"]))
+        if arm.get("weights_file"):
+            weights[arm["name"]] = load_weights(base / arm["weights_file"])
+    return {"name": experiment["name"], "bounds": bounds, "weights": weights}
+
+
+EXPERIMENT = _load_experiment(EXPERIMENT_FILE)
+
+
+def assign_arm(client_id: str) -> str:
+    """client_id 해시로 실험 그룹 결정 (저장/조회 없이 항상 같은 결과). 실험이 없으면 ""."""
+    if EXPERIMENT is None:
+        return ""
+    digest = hashlib.blake2b(f"{EXPERIMENT['name']}:{client_id}".encode(), digest_size=8).digest()
+    bucket = int.from_bytes(digest, "big") % BUCKETS
+    for upper, arm in EXPERIMENT["bounds"]:
+        if bucket < upper:
+            return arm
+    return EXPERIMENT["bounds"][-1][1]
+
+
+def arm_weights(arm: str) -> dict:
+    """그룹별 추천 점수표 (weights_file 이 없는 그룹은 현재 점수표)"""
+    if EXPERIMENT is None:
+        return WEIGHTS
+    return EXPERIMENT["weights"].get(arm, WEIGHTS)
+
+
+# ---------------------------- #
+#        그룹별 카운터
+# ---------------------------- #
+
+def _counters_path() -> Path:
+    return EXPERIMENT_DIR / f"{EXPERIMENT['name']}.json"
+
+
+def record(arm: str, event_name: str):
+    """그룹별 퍼널 카운터 +1 (로그를 다시 읽지 않도록 이벤트를 쓸 때 바로 갱신)"""
+    if EXPERIMENT is None or not arm or event_name not in FUNNEL_EVENTS:
+        return
+    EXPERIMENT_DIR.mkdir(parents=True, exist_ok=True)
+    path = _counters_path()
+    # 여러 워커 프로세스가 같은 파일을 갱신하므로 파일 잠금 안에서 읽고-더하고-교체
+    with open(EXPERIMENT_DIR / f".{path.stem}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            counters = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+            arm_counts = counters.setdefault(arm, {})
+            arm_counts[event_name] = arm_counts.get(event_name, 0) + 1
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(counters, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def arm_stats() -> list:
+    """그룹별 설문 완료 / 구매 클릭 / 전환율 (실험이 없으면 빈 리스트)"""
+    if EXPERIMENT is None:
+        return []
+    path = _counters_path()
+    counters = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    rows = []
+    for _, arm in EXPERIMENT["bounds"]:
+        counts = counters.get(arm, {})
+        completed = counts.get("survey_completed", 0)
+        purchased = counts.get("purchase_clicked", 0)
+        rows.append({
+            "arm": arm,
+            "survey_completed": completed,
+            "purchase_clicked": purchased,
+            "conversion": purchased / completed * 100 if completed else 0.0,
+        })
+    return rows
@@ -0,0 +1,231 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import perf
+
+# 내구성 정책 - 쓰기 처리량 ↔ 장애 시 잃을 수 있는 양
+#   write    : 기록마다 write + fsync (가장 느림, 잃는 것 없음)
+#   batch    : 동시에 들어온 기록을 한 번의 write + fsync 로 묶음 (잃는 것 없음)
+#   interval : 묶어서 write 만 하고 fsync 는 interval 초마다 (프로세스가 죽어도 안전, 전원/커널 장애 시 최근 interval 초 손실 가능)
+POLICIES = ("write", "batch", "interval")
+
+
+def fsync_dir(path: Path):
+    """디렉터리 항목(새 파일, 이름 변경)까지 디스크에 반영"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def drop_torn_tail(path: Path) -> int:
+    """쓰다 끊긴 마지막 줄(줄바꿈으로 끝나지 않은 부분)을 잘라냄 - 잘라낸 바이트 수 (쓰는 프로세스가 없을 때만 호출)"""
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return 0
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0
+        end = size
+        while end > 0:
+            start = max(0, end - 4096)
+            f.seek(start)
+            block = f.read(end - start)
+            if start + len(block) == size and block.endswith(b"\n"):
+                return 0
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        f.truncate(end)
+        f.flush()
+        os.fsync(f.fileno())
+    print(f"[group_commit] {path.name}: 끊긴 마지막 줄 {size - end}바이트 제거")
+    return size - end
+
+
+class _Entry:
+    __slots__ = ("data", "header", "done", "error")
+
+    def __init__(self, data: bytes, header: bytes):
+        self.data = data
+        self.header = header
+        self.done = False
+        self.error = None
+
+
+class GroupCommitLog:
+    """한 파일에 줄 단위로 append - 동시에 기다리는 기록을 모아 한 번에 쓰는 group commit
+
+    먼저 온 스레드가 대표(leader)가 되어 쌓인 기록을 한 번에 write(+fsync) 하고, 나머지는 자기 기록이 끝날 때까지 기다림.
+    파일은 O_APPEND 로만 쓰므로 이미 기록된 내용은 다시 쓰지 않음. 파일을 처음 열 때 끊긴 마지막 줄을 잘라냄
+    """
+
+    def __init__(self, name: str, path_fn, policy: str = "batch", interval: float = 1.0):
+        if policy not in POLICIES:
+            raise ValueError(f"durability policy must be one of {POLICIES}: {policy!r}")
+        self.name = name
+        self.policy = policy
+        self.interval = interval
+        self._path_fn = path_fn   # 매번 호출 (pid 가 들어간 경로라 fork 뒤에도 맞도록)
+        self._cond = threading.Condition()
+        self._pending = []
+        self._writing = False
+        self._paused = False
+        self._fd = None
+        self._fd_path = None
+        self._dirty = False       # write 했지만 아직 fsync 하지 않은 내용이 있음
+        self._last_sync = time.monotonic()
+        self._syncer = None
+        atexit.register(self.sync)
+
+    def append(self, data: bytes, header: bytes = b""):
+        """data 가 정책만큼 디스크에 반영되면 반환. 파일이 비어 있으면 header 를 먼저 씀. 쓰기 실패는 OSError"""
+        entry = _Entry(data, header)
+        with self._cond:
+            self._pending.append(entry)
+            while not entry.done:
+                if self._writing or self._paused:
+                    self._cond.wait()
+                    continue
+                self._lead()
+        if entry.error is not None:
+            raise entry.error
+
+    def _lead(self):
+        """쌓인 기록을 한 번에 씀 (self._cond 를 잡은 채 호출, 쓰는 동안은 놓음)"""
+        limit = 1 if self.policy == "write" else len(self._pending)
+        batch, self._pending = self._pending[:limit], self._pending[limit:]
+        self._writing = True
+        self._cond.release()
+        error = None
+        try:
+            with perf.span(f"group_commit.{self.name}"):
+                self._commit(batch)
+        except OSError as e:
+            error = e
+            perf.count_error(f"group_commit.{self.name}")
+        finally:
+            self._cond.acquire()
+            self._writing = False
+        for entry in batch:
+            entry.done = True
+            entry.error = error
+        self._cond.notify_all()
+
+    def _commit(self, batch: list):
+        fd = self._open()
+        start = os.fstat(fd).st_size
+        chunks = [entry.data for entry in batch]
+        if start == 0:
+            chunks.insert(0, batch[0].header)
+        view = memoryview(b"".join(chunks))
+        try:
+            while view:
+                view = view[os.write(fd, view):]
+        except BaseException:
+            self._rollback(fd, start)
+            raise
+        self._dirty = True
+
+        if self.policy != "interval":
+            self._fsync()
+        elif time.monotonic() - self._last_sync >= self.interval:
+            self._fsync()
+        else:
+            self._start_syncer()
+
+    def _rollback(self, fd: int, start: int):
+        """일부만 쓰고 실패한 batch 를 잘라냄 - 남겨 두면 다음 기록이 그 뒤에 붙어 이미 기록된 줄까지 깨짐
+
+        잘라내기마저 실패하면 파일을 닫아 다음 기록 때 _open 이 끊긴 마지막 줄을 잘라내게 함
+        """
+        try:
+            os.ftruncate(fd, start)
+            os.fsync(fd)
+        except OSError as e:
+            print(f"[group_commit] {self.name} 실패한 쓰기 되돌리기 실패:", repr(e))
+            os.close(fd)
+            self._fd = None
+            self._fd_path = None
+
+    def _fsync(self):
+        os.fsync(self._fd)
+        self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def _open(self) -> int:
+        path = self._path_fn()
+        if self._fd is not None and self._fd_path == path:
+            return self._fd
+        self._close()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        created = not path.exists()
+        if not created:
+            drop_torn_tail(path)   # 같은 이름으로 다시 시작한 경우 (EVENT_SHARD_ID 고정 등)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._fd_path = path
+        if created:
+            fsync_dir(path.parent)
+        return self._fd
+
+    def _close(self):
+        if self._fd is None:
+            return
+        if self._dirty:
+            self._fsync()
+        os.close(self._fd)
+        self._fd = None
+        self._fd_path = None
+
+    # ---------- interval 정책 ----------
+
+    def _start_syncer(self):
+        """쓰기가 멈춰도 interval 안에 fsync 되도록 백그라운드 스레드 하나 (처음 필요할 때)"""
+        if self._syncer is None:
+            self._syncer = threading.Thread(target=self._sync_loop, name=f"group-commit-{self.name}", daemon=True)
+            self._syncer.start()
+
+    def _sync_loop(self):
+        while True:
+            time.sleep(self.interval)
+            self.sync()
+
+    def sync(self):
+        """아직 fsync 하지 않은 내용을 지금 반영 (종료 시, interval 정책의 주기마다)"""
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            if self._fd is not None and self._dirty:
+                try:
+                    self._fsync()
+                except OSError as e:
+                    print(f"[group_commit] {self.name} fsync 실패:", repr(e))
+                    perf.count_error(f"group_commit.{self.name}")
+
+    @contextmanager
+    def paused(self):
+        """진행 중인 쓰기를 끝내고 파일을 닫은 채로 멈춤 (파일 로테이션 중). 그동안 온 기록은 기다렸다가 새 파일에 씀"""
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            self._paused = True
+            try:
+                self._close()
+            except OSError:
+                self._paused = False
+                raise
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._paused = False
+                self._cond.notify_all()
@@ -0,0 +1,36 @@
+import io
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent   # .../WaterOfLife/app
+IMG_DIR = APP_DIR / "images"
+
+GALLERY_HEIGHT = 210   # 갤러리 표시 높이 (px)
+
+
+def _has_transparency(im) -> bool:
+    if im.mode == "P":
+        return "transparency" in im.info
+    if im.mode in ("RGBA", "LA"):
+        return im.getchannel("A").getextrema()[0] < 255   # 알파 채널이 있어도 전부 불투명일 수 있음
+    return False
+
+
+def resized_image(path: Path, width: int = None, height: int = None) -> bytes:
+    """표시 크기에 맞춘 축소본 (수 MB 원본을 그대로 보내지 않도록)
+
+    실제로 투명한 픽셀이 있으면 PNG 로, 나머지는 JPEG 로 저장
+    """
+    from PIL import Image
+
+    with Image.open(path) as im:
+        im.load()
+    im.thumbnail((width or height * 4, height or width * 4))
+    buf = io.BytesIO()
+    if _has_transparency(im):
+        im.save(buf, format="PNG", optimize=True)
+    else:
+        im.convert("RGB").save(buf, format="JPEG", quality=82, optimize=True)
+    # 원본이 이미 작으면 원본 그대로
+    if buf.tell() >= path.stat().st_size:
+        return path.read_bytes()
+    return buf.getvalue()
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import deque
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import memory_budget
+import perf
+from settings import get_setting
+
+# 이 값을 넘으면 과부하(degraded) 모드 - 통계 페이지가 덜 일해서 설문 제출을 살림
+DEGRADE_LATENCY_MS = get_setting("DEGRADE_LATENCY_MS", 1500.0)   # 최근 스크립트 실행 p95
+DEGRADE_IN_FLIGHT = get_setting("DEGRADE_IN_FLIGHT", 12)         # 동시에 실행 중인 세션 수
+RECOVER_RATIO = 0.5           # 두 값이 모두 기준의 이 비율 아래로 내려가야 정상 모드로 복귀 (모드가 깜빡이지 않도록)
+MIN_DEGRADED_SECONDS = 30.0   # 과부하 모드는 최소 이만큼 유지
+WINDOW_SECONDS = 30.0         # 지연 시간을 보는 최근 구간
+RUN_TIMEOUT = 60.0            # st.stop()/switch_page 로 끝 표시 없이 빠져나간 실행은 이 시간 뒤 in-flight 에서 제외
+
+# 과부하 모드에서 통계 페이지 동작
+DEGRADED_REFRESH_SECONDS = get_setting("DEGRADED_REFRESH_SECONDS", 60)   # 변경 알림 대신 이 주기로만 갱신
+
+_lock = threading.Lock()
+_running = {}          # session_id → 실행 시작 시각 (세션은 한 번에 하나의 실행만 가짐)
+_samples = deque()     # (끝난 시각, 실행 시간 ms)
+_state = {"degraded": False, "since": 0.0}
+
+
+# ---------------------------- #
+#        실행 측정
+# ---------------------------- #
+
+def _session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def begin_run():
+    """페이지 맨 위에서 호출 - 이 세션의 스크립트 실행 시작"""
+    session_id = _session_id()
+    if session_id is None:
+        return
+    with _lock:
+        _running[session_id] = time.monotonic()
+
+
+def end_run(name: str = "page_run"):
+    """페이지 끝(또는 st.stop() 직전)에서 호출 - 실행 시간을 기록하고 세션 메모리를 잼"""
+    memory_budget.account_session()
+    session_id = _session_id()
+    now = time.monotonic()
+    with _lock:
+        started = _running.pop(session_id, None)
+        if started is None:
+            return
+        elapsed_ms = (now - started) * 1000
+        _samples.append((now, elapsed_ms))
+    perf.record(name, elapsed_ms)
+
+
+def _prune(now: float):
+    while _samples and now - _samples[0][0] > WINDOW_SECONDS:
+        _samples.popleft()
+    for session_id, started in list(_running.items()):
+        if now - started > RUN_TIMEOUT:
+            del _running[session_id]
+
+
+def _p95(values) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+# ---------------------------- #
+#        모드
+# ---------------------------- #
+
+def status() -> dict:
+    """현재 부하와 모드 (호출할 때마다 기준과 비교해 모드를 갱신)"""
+    now = time.monotonic()
+    with _lock:
+        _prune(now)
+        latency = _p95([ms for _, ms in _samples])
+        in_flight = len(_running)
+
+        overloaded = latency > DEGRADE_LATENCY_MS or in_flight > DEGRADE_IN_FLIGHT
+        calm = latency < DEGRADE_LATENCY_MS * RECOVER_RATIO and in_flight < DEGRADE_IN_FLIGHT * RECOVER_RATIO
+        if not _state["degraded"] and overloaded:
+            _state.update(degraded=True, since=now)
+            print(f"[load_guard] 과부하 모드 시작 (p95 {latency:.0f}ms, 실행 중 {in_flight})")
+        elif _state["degraded"] and calm and now - _state["since"] >= MIN_DEGRADED_SECONDS:
+            _state.update(degraded=False, since=now)
+            print(f"[load_guard] 정상 모드 복귀 (p95 {latency:.0f}ms, 실행 중 {in_flight})")
+
+        return {
+            "degraded": _state["degraded"],
+            "p95_ms": round(latency, 1),
+            "in_flight": in_flight,
+            "runs": len(_samples),
+            "since_seconds": round(now - _state["since"], 1) if _state["since"] else None,
+        }
+
+
+def is_degraded() -> bool:
+    return status()["degraded"]
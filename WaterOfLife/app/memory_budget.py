@@ -0,0 +1,270 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from settings import get_setting
+
+MB = 1024 * 1024
+
+# 세션별 상한: session_state + 세션 캐시(session_cached) 합계. 넘으면 그 세션의 캐시부터 비움
+SESSION_MAX_MB = get_setting("SESSION_MEMORY_MAX_MB", 20.0)
+# 모든 세션 캐시 합계 상한 - 넘으면 가장 큰 세션의 캐시부터 비움
+SESSIONS_MAX_MB = get_setting("SESSIONS_MEMORY_MAX_MB", 300.0)
+SESSION_IDLE_SECONDS = 1800.0   # 이만큼 실행이 없던 세션은 집계에서 빠짐 (연결이 끊긴 세션)
+
+_MISSING = object()
+_caches = []   # 관리자 페이지에 보여줄 모든 SizedLRU (생성 순서)
+_probes = {}   # 이름 → 크기를 잴 객체를 돌려주는 함수 (cache_resource 처럼 SizedLRU 밖에 있는 캐시)
+
+
+def estimate_bytes(obj, _seen: set = None) -> int:
+    """객체가 차지하는 메모리 추정치 (컨테이너는 안까지, pandas/numpy/Arrow 는 버퍼 크기)
+
+    여러 번 참조된 객체는 한 번만 셈
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    memory_usage = getattr(obj, "memory_usage", None)
+    if callable(memory_usage):   # pandas DataFrame/Series/Index
+        usage = memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):   # numpy 배열, pyarrow Table
+        return nbytes
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_bytes(k, seen) + estimate_bytes(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_bytes(item, seen) for item in obj)
+    return size
+
+
+def track(name: str, get_object):
+    """SizedLRU 밖에 있는 캐시도 관리자 페이지 합계에 포함 (get_object 는 잴 때만 호출)"""
+    _probes[name] = get_object
+
+
+class SizedLRU:
+    """바이트 크기로 제한하는 LRU 캐시 - 넣을 때 크기를 재고, 합계가 max_bytes 를 넘으면 오래 안 쓴 것부터 버림
+
+    max_bytes 보다 큰 값 하나는 캐시하지 않고 그대로 돌려줌
+    """
+
+    def __init__(self, name: str, max_bytes: float, register: bool = True):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()   # key → (value, 크기)
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()   # 없는 값을 만드는 동안 (조회는 막지 않음)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if register:
+            _caches.append(self)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = estimate_bytes(value)
+        with self._lock:
+            self.pop(key)
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self.bytes += size
+            self.shrink(self.max_bytes)
+        return value
+
+    def get_or_create(self, key, factory):
+        """있으면 캐시 값, 없으면 factory() 결과를 넣고 반환 (여러 세션이 같은 값을 동시에 만들지 않도록)"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._build_lock:
+            with self._lock:
+                entry = self._entries.get(key)   # 기다리는 동안 다른 스레드가 만들었으면 그대로
+            if entry is not None:
+                return entry[0]
+            return self.put(key, factory())
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+
+    def shrink(self, target_bytes: float) -> int:
+        """target_bytes 이하가 될 때까지 오래 안 쓴 것부터 버림 - 버린 바이트 수"""
+        freed = 0
+        with self._lock:
+            while self._entries and self.bytes > target_bytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self.bytes -= size
+                self.evictions += 1
+                freed += size
+        return freed
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "cache": self.name,
+            "entries": len(self),
+            "mb": round(self.bytes / MB, 2),
+            "max_mb": round(self.max_bytes / MB, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# ---------------------------- #
+#        세션별
+# ---------------------------- #
+
+class _Session:
+    __slots__ = ("cache", "state_bytes", "last_seen")
+
+    def __init__(self, session_id: str):
+        self.cache = SizedLRU(f"session:{session_id[:8]}", SESSION_MAX_MB * MB, register=False)
+        self.state_bytes = 0
+        self.last_seen = time.monotonic()
+
+    @property
+    def total_bytes(self) -> int:
+        return self.state_bytes + self.cache.bytes
+
+
+_sessions = {}   # session_id → _Session
+_sessions_lock = threading.Lock()
+
+
+def _session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def _session(session_id: str) -> _Session:
+    with _sessions_lock:
+        session = _sessions.get(session_id)
+        if session is None:
+            session = _sessions[session_id] = _Session(session_id)
+        session.last_seen = time.monotonic()
+        return session
+
+
+def session_cached(key, factory):
+    """이 세션에서만 쓰는 큰 객체를 세션 캐시에 보관 - 상한을 넘으면 여기서부터 비워짐
+
+    세션 밖(테스트 등)에서는 캐시 없이 factory() 그대로
+    """
+    session_id = _session_id()
+    if session_id is None:
+        return factory()
+    value = _session(session_id).cache.get_or_create(key, factory)
+    _enforce_total()
+    return value
+
+
+def account_session():
+    """실행이 끝날 때 호출 - 이 세션의 session_state 크기를 재고 상한을 넘으면 세션 캐시를 비움"""
+    import streamlit as st
+
+    session_id = _session_id()
+    if session_id is None:
+        return
+    _forget_closed_sessions()
+    session = _session(session_id)
+    session.state_bytes = estimate_bytes(st.session_state.to_dict())
+
+    budget = SESSION_MAX_MB * MB
+    if session.total_bytes > budget:
+        freed = session.cache.shrink(max(0, budget - session.state_bytes))
+        print(f"[memory_budget] 세션 {session_id[:8]} 상한 초과 - 캐시 {freed / MB:.1f}MB 비움")
+
+
+def _enforce_total():
+    """모든 세션 캐시 합계가 상한을 넘으면 가장 큰 세션부터 비움"""
+    budget = SESSIONS_MAX_MB * MB
+    with _sessions_lock:
+        sessions = sorted(_sessions.values(), key=lambda s: s.cache.bytes, reverse=True)
+    excess = sum(s.cache.bytes for s in sessions) - budget
+    for session in sessions:
+        if excess <= 0:
+            break
+        excess -= session.cache.shrink(max(0, session.cache.bytes - excess))
+
+
+def _forget_closed_sessions():
+    """연결이 끊겼거나 오래 쉰 세션은 캐시째 버림"""
+    from streamlit.runtime import Runtime
+
+    runtime = Runtime.instance() if Runtime.exists() else None
+    now = time.monotonic()
+    with _sessions_lock:
+        for session_id, session in list(_sessions.items()):
+            closed = runtime is not None and not runtime.is_active_session(session_id)
+            if closed or now - session.last_seen > SESSION_IDLE_SECONDS:
+                del _sessions[session_id]
+
+
+# ---------------------------- #
+#        관리자 페이지
+# ---------------------------- #
+
+def session_rows() -> list:
+    _forget_closed_sessions()
+    now = time.monotonic()
+    with _sessions_lock:
+        sessions = list(_sessions.items())
+    return [
+        {
+            "session": session_id[:8],
+            "state_mb": round(session.state_bytes / MB, 3),
+            "cache_mb": round(session.cache.bytes / MB, 3),
+            "cache_entries": len(session.cache),
+            "evictions": session.cache.evictions,
+            "idle_s": round(now - session.last_seen, 1),
+        }
+        for session_id, session in sorted(sessions, key=lambda item: item[1].total_bytes, reverse=True)
+    ]
+
+
+def cache_rows() -> list:
+    rows = [cache.stats() for cache in _caches]
+    for name, get_object in _probes.items():
+        try:
+            size = estimate_bytes(get_object())
+        except Exception as e:
+            print(f"[memory_budget] {name} 크기 측정 실패:", repr(e))
+            continue
+        rows.append({"cache": name, "entries": None, "mb": round(size / MB, 2), "max_mb": None,
+                     "hits": None, "misses": None, "evictions": None})
+    return rows
+
+
+def rss_mb() -> float:
+    """이 프로세스의 현재 RSS (Linux 가 아니면 None)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+    except (OSError, ValueError):
+        return None
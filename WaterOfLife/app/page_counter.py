@@ -1,12 +1,37 @@
-from supabase_client import supabase
+from concurrent.futures import ThreadPoolExecutor
 
+from supabase_client import get_supabase
+import perf
+from rate_limit import RateLimiter
+from settings import get_setting
 
-def increase_page_view(page_name: str):
-    """특정 페이지의 조회수 +1"""
-    supabase.rpc("increment_page_view", {"p_page_name": page_name}).execute()
+# 조회수 +1 은 화면과 무관하므로 백그라운드에서 처리 (첫 화면이 네트워크 왕복을 기다리지 않음)
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-view")
+
+# 새로고침 반복/크롤러가 Supabase 쓰기를 늘리지 않도록 (초당 개수, 0 = 제한 없음)
+PAGE_VIEW_RATE_PER_CLIENT = get_setting("PAGE_VIEW_RATE_PER_CLIENT", 0.5)
+PAGE_VIEW_RATE_GLOBAL = get_setting("PAGE_VIEW_RATE_GLOBAL", 50.0)
+_limiter = RateLimiter("page_views", PAGE_VIEW_RATE_PER_CLIENT, PAGE_VIEW_RATE_PER_CLIENT * 20,
+                       PAGE_VIEW_RATE_GLOBAL, PAGE_VIEW_RATE_GLOBAL * 2)
+
+
+def increase_page_view(page_name: str, client_id: str = None):
+    """특정 페이지의 조회수 +1 (비동기). 속도 제한에 걸리면 세지 않음"""
+    if not _limiter.allow(client_id):
+        return
+    _executor.submit(_increase_page_view, page_name)
+
+
+@perf.timed("increase_page_view")
+def _increase_page_view(page_name: str):
+    try:
+        get_supabase().rpc("increment_page_view", {"p_page_name": page_name}).execute()
+    except Exception as e:
+        print("[increase_page_view] 실패:", repr(e))
+        perf.count_error("increase_page_view")
 
 
 def get_all_page_views():
     """전체 페이지별 조회수 불러오기"""
-    result = supabase.table("page_views").select("*").execute()
+    result = get_supabase().table("page_views").select("*").execute()
     return result.data
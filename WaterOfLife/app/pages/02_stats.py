@@ -1,7 +1,6 @@
 import streamlit as st
 from streamlit_autorefresh import st_autorefresh
-import pandas as pd
-from pathlib import Path
+from profiler import maybe_profile_page
 
 # ============================================================
 # 1) 페이지 설정 (항상 최상단)
@@ -10,31 +9,39 @@ st.set_page_config(
     page_icon="📊",
     layout="centered",
 )
-# 2) 파일 경로 정의 (전환율 계산 전에 반드시 필요)
-ROOT_DIR = Path(__file__).resolve().parents[2]
-
-DATA_DIR = ROOT_DIR / "data"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
-
-CSV_PATH = DATA_DIR / "survey_results.csv"
-EVENT_CSV = DATA_DIR / "events.csv"
-
-# 3) 자동 새로고침
-st_autorefresh(interval=10000, key="stats_refresh")
+maybe_profile_page(__file__)   # ?profile=1&token=... 일 때만 동작
+
+# 2) 데이터 저장소 (라이브 파일 + 세그먼트, event_store.py)
+from event_store import RETENTION_DAYS
+from perf import span
+from warmup import start_warmup
+import load_guard
+
+start_warmup()   # 프로세스당 한 번 - 카탈로그/추천/Supabase/통계 캐시를 미리 채움
+load_guard.begin_run()
+# 과부하 모드: 마지막 스냅샷 그대로, 갱신 주기 늘림, heartbeat/cleanup 생략 → 설문 제출에 자원 양보
+load = load_guard.status()
+DEGRADED = load["degraded"]
+
+# 3) 변경 알림 구독 - 새 이벤트/설문이 들어왔을 때만 rerun (고정 주기 polling 대신)
+from change_notifier import subscribe_current_session, unsubscribe_current_session
+
+if DEGRADED:
+    unsubscribe_current_session()
+    st_autorefresh(interval=load_guard.DEGRADED_REFRESH_SECONDS * 1000, key="stats_refresh_degraded")
+elif not subscribe_current_session():
+    # 런타임 밖(테스트 등)이거나 세션을 깨울 수 없는 Streamlit 버전이면 예전처럼 10초 polling
+    st_autorefresh(interval=10000, key="stats_refresh")
 
 # ============================================================
 # 4) 실시간 사용자 + 조회수 시스템
 # ============================================================
 from realtime_users import heartbeat, cleanup_throttled, get_active_users
+import active_history
 from page_counter import increase_page_view, get_all_page_views
 
-# 실시간 업데이트
-heartbeat()
-cleanup_throttled()  # 30초에 한 번만 cleanup 실행 (realtime_users.py에서 interval 조정 가능)
-active_users_count = get_active_users()
-
 # 조회수 증가
-increase_page_view("통계")
+increase_page_view("통계", st.session_state.get("client_id"))
 
 
 # ============================================================
@@ -42,133 +49,134 @@ increase_page_view("통계")
 # ============================================================
 st.title("📊 생명의물 통계")
 st.markdown("#### 페이지별 조회수와 유입 흐름 분석입니다.")
+if DEGRADED:
+    st.warning(
+        f"⚠️ 접속이 많아 간소화 모드로 표시 중입니다 "
+        f"(최근 실행 p95 {load['p95_ms']:.0f}ms, 실행 중 {load['in_flight']}개). "
+        f"통계는 {load_guard.DEGRADED_REFRESH_SECONDS}초마다 갱신됩니다."
+    )
+else:
+    st.caption(f"서버 상태: 정상 (최근 실행 p95 {load['p95_ms']:.0f}ms, 실행 중 {load['in_flight']}개)")
 st.markdown("---")
 
+# pandas 는 제목을 먼저 그린 뒤에 import (첫 화면이 import 를 기다리지 않도록)
+import pandas as pd
+import stats_core
+from stats_snapshot import PERIOD_DAYS, load_snapshot
+import experiments
+from memory_budget import session_cached
+
 # ============================================================
 # 페이지별 조회수
 # ============================================================
 st.subheader("📈 페이지별 조회수")
 
-views = get_all_page_views()
+with span("stats.page_views"):
+    views = get_all_page_views()
 
-if views:
-    df_views = (
-        pd.DataFrame(views)
-        .rename(columns={"page_name": "페이지", "view_count": "조회수"})
-        .sort_values("조회수", ascending=False)
-    )
-    st.dataframe(df_views, width="stretch")
-else:
-    st.info("아직 조회수 데이터가 없습니다.")
+    if views:
+        df_views = (
+            pd.DataFrame(views)
+            .rename(columns={"page_name": "페이지", "view_count": "조회수"})
+            .sort_values("조회수", ascending=False)
+        )
+        st.dataframe(df_views, width="stretch")
+    else:
+        st.info("아직 조회수 데이터가 없습니다.")
 
-st.write(f"🔥 **현재 실시간 사용자:** {active_users_count}명")
+
+# 실시간 사용자는 CSV와 무관하므로 이 부분만 30초마다 따로 갱신 (heartbeat 유지)
+@st.fragment(run_every=30)
+def realtime_users_section():
+    if not load_guard.is_degraded():   # 과부하 중에는 Supabase 쓰기 생략 (읽기만)
+        heartbeat()
+        cleanup_throttled()  # 30초에 한 번만 cleanup 실행 (realtime_users.py에서 interval 조정 가능)
+    active_users_count = get_active_users()
+    st.write(f"🔥 **현재 실시간 사용자:** {active_users_count}명")
+
+    # 추이는 기록 스레드가 쌓아 둔 링 버퍼만 읽음 (Supabase 추가 조회 없음)
+    trend = active_history.history()
+    if len(trend) > 1:
+        st.line_chart(trend.resample("1min").max(), height=180)
+        st.caption(f"최근 {active_history.HISTORY_HOURS}시간 실시간 사용자 추이 (1분 단위 최대값)")
+
+
+realtime_users_section()
 st.markdown("---")
 
 
+# ============================================================
+# 분석 기간 - 집계는 stats_snapshot 에서 데이터가 바뀔 때만 다시 계산
+# ============================================================
+PERIODS = {
+    f"최근 {days}일" if days else "전체 (보관 데이터 포함)": days
+    for days in PERIOD_DAYS
+}
+# 기본은 보관 기간 (위치가 아닌 값으로 - 기간이 겹쳐 선택지가 줄어도 맞도록)
+period = st.radio("분석 기간", list(PERIODS), index=PERIOD_DAYS.index(RETENTION_DAYS), horizontal=True)
+snapshot = load_snapshot(PERIODS[period], allow_stale=DEGRADED)
+
 # ============================================================
 # 전환율 계산
 # ============================================================
-if EVENT_CSV.exists():
-    events = pd.read_csv(EVENT_CSV)
-else:
+if "funnel" not in snapshot:
     st.info("아직 이벤트 데이터가 없습니다. 설문/통계 페이지를 이용해 주세요.")
+    load_guard.end_run("page_run.stats")
     st.stop()
 
-if "timestamp" in events.columns:
-    events["timestamp"] = pd.to_datetime(events["timestamp"])
-else:
+if not snapshot["has_timestamp"]:
     st.warning("⚠ events.csv에 'timestamp' 컬럼이 없어 시간대/재방문 통계가 제한될 수 있습니다.")
 
 st.subheader("🔁 유입 → 설문 → 구매 흐름 분석 (Funnel)")
 st.markdown("`client_id` 기준으로 설문 완료 후 구매 버튼까지 도달한 비율을 계산합니다.")
 
-# 유입 세션: events에 등장한 client_id 전체
-all_clients = set(events["client_id"]) if "client_id" in events.columns else set()
-
-survey_clients = set(events.loc[events["event"] == "survey_completed", "client_id"])
-purchase_clients = set(events.loc[events["event"] == "purchase_clicked", "client_id"])
-
-total_inflow = len(all_clients)
-total_survey = len(survey_clients)
-total_purchase = len(survey_clients & purchase_clients)   # 설문 완료한 사람 중 구매버튼까지 간 사람
-
-def ratio(part, whole):
-    return (part / whole * 100) if whole > 0 else 0.0
-
-funnel_data = [
-    {"단계": "유입(홈)", "세션 수": total_inflow, "전 단계 대비 전환율(%)": 100.0},
-    {"단계": "설문 완료", "세션 수": total_survey, "전 단계 대비 전환율(%)": ratio(total_survey, total_inflow)},
-    {"단계": "구매 버튼 클릭", "세션 수": total_purchase, "전 단계 대비 전환율(%)": ratio(total_purchase, total_survey)},
-]
-df_funnel = pd.DataFrame(funnel_data)
-order = ["유입(홈)", "설문 완료", "구매 버튼 클릭"]
-df_funnel["단계"] = pd.Categorical(df_funnel["단계"], categories=order, ordered=True)
-df_funnel = df_funnel.sort_values("단계")
-
+df_funnel = snapshot["funnel"]
+if snapshot.get("sampled"):
+    # 방문일 bitset / 체류 시간 스케치는 표본과 무관하게 전부 기록
+    estimated = "·".join(["유입"] + [name for name, key in (("방문일", "visits_tracked"), ("체류", "dwell_tracked"))
+                                    if not snapshot.get(key)])
+    st.caption(
+        f"일부 이벤트(예: 홈 방문)는 표본만 기록하므로 {estimated} 세션 수는 가중치로 되돌린 추정치이며, "
+        "'오차' 컬럼은 95% 신뢰구간 폭입니다. 설문 완료/구매 클릭은 전부 기록됩니다."
+    )
 st.dataframe(df_funnel, width="stretch")
-
 st.bar_chart(df_funnel.set_index("단계")["세션 수"])
 st.markdown("---")
 
+# A/B 실험 - 이벤트를 쓸 때 갱신한 그룹별 카운터만 읽음 (로그를 다시 훑지 않음)
+arm_rows = experiments.arm_stats()
+if arm_rows:
+    st.subheader(f"🧪 추천 실험: {experiments.EXPERIMENT['name']}")
+    df_arms = pd.DataFrame(arm_rows).rename(columns={
+        "arm": "그룹",
+        "survey_completed": "설문 완료",
+        "purchase_clicked": "구매 클릭",
+        "conversion": "전환율(%)",
+    })
+    st.dataframe(df_arms, width="stretch")
+    st.bar_chart(df_arms.set_index("그룹")["전환율(%)"])
+    st.markdown("---")
+
 
 
 # 체류시간 분포
 st.subheader("설문 완료 → 통계 페이지 진입까지 소요 시간 분포 (초 단위)")
 
-if "timestamp" in events.columns:
-    # 설문 완료 & 통계 방문이 모두 있는 client만 대상
-    survey_ev = events[events["event"] == "survey_completed"][["client_id", "timestamp"]]
-    stats_ev = events[events["event"] == "stats_viewed"][["client_id", "timestamp"]]
-
-    # 각 client_id별 최초 설문 완료 시각, 최초 통계 방문 시각
-    survey_first = survey_ev.groupby("client_id")["timestamp"].min()
-    stats_first = stats_ev.groupby("client_id")["timestamp"].min()
-
-    joined = (
-        pd.concat(
-            [
-                survey_first.rename("survey_time"),
-                stats_first.rename("stats_time"),
-            ],
-            axis=1
-        )
-        .dropna()  # 둘 다 있는 client만
-    )
-
-    if not joined.empty:
-        # 🔥 소요 시간 (초 단위)
-        joined["diff_sec"] = (joined["stats_time"] - joined["survey_time"]).dt.total_seconds().astype(int)
-
-        st.write(f"분석 대상 세션 수: **{len(joined)}**")
-
-        # 요약 통계 (초 단위)
-        summary = joined["diff_sec"].describe()[["count", "mean", "50%", "max"]]
-        summary = summary.rename({
-            "count": "개수",
-            "mean": "평균(초)",
-            "50%": "중앙값(초)",
-            "max": "최대(초)",
-        }).to_frame("값")
-
-        st.dataframe(summary, width="stretch")
-
-        # 🔥 10초 단위 구간 분포 (보기 좋게)
-        bins = [0, 10, 20, 30, 60, 120, 300, 600, 999999]
-        labels = [
-            "0~10초", "10~20초", "20~30초", "30~60초",
-            "1~2분", "2~5분", "5~10분", "10분 이상"
-        ]
-        joined["bucket"] = pd.cut(joined["diff_sec"], bins=bins, labels=labels, right=False)
+if "dwell_summary" in snapshot:
+    # 🔥 소요 시간 (초 단위) - 설문 완료 & 통계 방문이 모두 있는 client만 대상
+    st.write(f"분석 대상 세션 수: **{snapshot['dwell_sessions']}**")
 
-        bucket_counts = joined["bucket"].value_counts().sort_index().reset_index()
-        bucket_counts.columns = ["구간", "세션 수"]
+    # 요약 통계 (초 단위)
+    st.dataframe(snapshot["dwell_summary"], width="stretch")
 
-        st.subheader("⏱ 소요 시간 구간별 세션 수")
-        st.dataframe(bucket_counts, width="stretch")
-        st.bar_chart(bucket_counts.set_index("구간")["세션 수"])
+    # 🔥 10초 단위 구간 분포 (보기 좋게)
+    bucket_counts = snapshot["dwell_buckets"]
 
-    else:
-        st.info("설문 완료와 통계 페이지 방문이 모두 있는 세션이 아직 없습니다.")
+    st.subheader("⏱ 소요 시간 구간별 세션 수")
+    st.dataframe(bucket_counts, width="stretch")
+    st.bar_chart(bucket_counts.set_index("구간")["세션 수"])
+elif snapshot["has_timestamp"]:
+    st.info("설문 완료와 통계 페이지 방문이 모두 있는 세션이 아직 없습니다.")
 else:
     st.info("timestamp 컬럼이 없어 체류 시간 분석이 어렵습니다.")
 
@@ -176,26 +184,19 @@ st.markdown("---")
 
 st.header("재방문율 (Returning User Rate)")
 
-if "timestamp" in events.columns:
-    events["date"] = events["timestamp"].dt.date
-
-    visits_per_client = events.groupby("client_id")["date"].nunique().reset_index(name="방문일 수")
-    total_clients = len(visits_per_client)
-    returning = (visits_per_client["방문일 수"] >= 2).sum()
-
-    returning_rate = (returning / total_clients * 100) if total_clients > 0 else 0.0
+if "returning" in snapshot:
+    returning = snapshot["returning"]
 
     st.markdown(
         f"""
-        - 전체 고유 세션(client_id) 수: **{total_clients}**  
-        - 2일 이상 방문한 세션 수: **{returning}**  
-        - 재방문율: **{returning_rate:.1f}%**
+        - 전체 고유 세션(client_id) 수: **{returning["total_clients"]}**  
+        - 2일 이상 방문한 세션 수: **{returning["returning"]}**  
+        - 재방문율: **{returning["returning_rate"]:.1f}%**
         """
     )
 
     st.subheader("방문일 수 분포")
-    dist = visits_per_client["방문일 수"].value_counts().sort_index().reset_index()
-    dist.columns = ["방문일 수", "세션 수"]
+    dist = snapshot["visit_days"]
     st.dataframe(dist, width="stretch")
     st.bar_chart(dist.set_index("방문일 수")["세션 수"])
 else:
@@ -206,17 +207,16 @@ st.markdown("---")
 
 
 # ============================================================
-# 8) 설문 데이터 로드
+# 8) 설문 데이터
 # ============================================================
-if not CSV_PATH.exists():
+if "survey_count" not in snapshot:
     st.warning("아직 설문 데이터가 없습니다!")
     st.page_link("pages/01_survey.py", label="🍸 설문하러 가기", icon="🍸")
+    load_guard.end_run("page_run.stats")
     st.stop()
 
-df = pd.read_csv(CSV_PATH)
-
-total_count = len(df)
-mean_abv = df["abv"].mean() if "abv" in df.columns and len(df) > 0 else None
+total_count = snapshot["survey_count"]
+mean_abv = snapshot["mean_abv"]
 st.header("설문 결과")
 st.markdown("#### 지금까지 설문에 참여한 사람들의 취향 데이터를 모아봤어요.")
 
@@ -231,21 +231,18 @@ st.markdown("---")
 
 # 2. 추천 술 타입 분포
 st.subheader("추천 술 타입 vs 분위기(무드) 상관 분석")
-if CSV_PATH.exists():
-    df_survey = pd.read_csv(CSV_PATH)
-else:
-    df_survey = None
-    
-if df_survey is not None and {"mood", "recommended"}.issubset(df_survey.columns):
-    mood_rec = df_survey.groupby(["mood", "recommended"]).size().reset_index(name="count")
-    pivot_count = mood_rec.pivot(index="mood", columns="recommended", values="count").fillna(0).astype(int)
+
+if "mood_pivot" in snapshot:
+    pivot_count = snapshot["mood_pivot"]
 
     st.subheader("🔢 분위기 × 추천 술 타입 (개수)")
     st.dataframe(pivot_count, width="stretch")
 
-    # 분위기(mood)별 비율(%)
-    pivot_ratio = pivot_count.div(pivot_count.sum(axis=1), axis=0) * 100
-    pivot_ratio = pivot_ratio.round(1)
+    # 분위기(mood)별 비율(%) - 같은 스냅샷이면 rerun 때 다시 계산하지 않음 (세션 캐시, 메모리 상한 대상)
+    pivot_ratio = session_cached(
+        ("pivot_ratio", PERIODS[period], snapshot.get("built_at")),
+        lambda: stats_core.pivot_ratio(pivot_count),
+    )
 
     st.subheader("📊 분위기 × 추천 술 타입 (행 기준 비율 %)")
     st.dataframe(pivot_ratio, width="stretch")
@@ -259,11 +256,23 @@ if df_survey is not None and {"mood", "recommended"}.issubset(df_survey.columns)
 else:
     st.info("설문 데이터에 'mood' 혹은 'recommended' 컬럼이 없어 분석할 수 없습니다.")
 st.markdown("---")
+
+# 추천 술별 구매 전환 (설문의 client_id ↔ 이벤트 client_id)
+st.subheader("🛒 추천 술 종류별 구매 전환율")
+
+if "category_conversion" in snapshot:
+    df_conv = snapshot["category_conversion"]
+    st.caption(f"client_id 가 기록된 설문 세션 {snapshot['linked_surveys']}개 기준 (세션별 마지막 추천)")
+    st.dataframe(df_conv, width="stretch")
+    st.bar_chart(df_conv.set_index("추천 술")["전환율(%)"])
+else:
+    st.info("client_id 가 기록된 설문이 아직 없어 전환율을 계산할 수 없습니다.")
+st.markdown("---")
 # 12) 4. 안주/음식
 st.subheader("어떤 안주를 원하나요?")
 
-if "food" in df.columns:
-    food_counts = df["food"].value_counts().rename_axis("안주/음식").reset_index(name="응답 수")
+if "food" in snapshot:
+    food_counts = snapshot["food"]
 
     st.dataframe(food_counts, width="stretch")
     st.bar_chart(food_counts.set_index("안주/음식")["응답 수"])
@@ -289,3 +298,5 @@ st.markdown(
 st.markdown("---")
 st.page_link("WaterOfLife.py", label="🏠 메인 페이지로 돌아가기", icon="🏠")
 st.page_link("pages/01_survey.py", label="🍸 설문 다시 하러 가기", icon="🍸")
+
+load_guard.end_run("page_run.stats")
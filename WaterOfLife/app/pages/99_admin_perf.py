@@ -0,0 +1,64 @@
+import streamlit as st
+import pandas as pd
+
+from admin import require_admin
+import memory_budget
+import perf
+import rate_limit
+import warmup
+
+st.set_page_config(
+    page_title="성능 | 생명의물",
+    page_icon="⏱",
+    layout="wide",
+)
+
+# 토큰(?token=...)이 맞을 때만 표시
+require_admin()
+
+st.title("⏱ 내부 성능 지표")
+st.markdown("#### 이 서버 프로세스가 시작된 뒤의 구간(span)별 지연 시간입니다.")
+
+rows = perf.snapshot()
+
+if rows:
+    df_perf = pd.DataFrame(rows).set_index("span")
+    st.dataframe(df_perf, width="stretch")
+
+    st.subheader("p95 지연 시간 (ms)")
+    st.bar_chart(df_perf["p95_ms"])
+else:
+    st.info("아직 기록된 span 이 없습니다.")
+
+st.subheader("🔥 시작 워밍업")
+warmup_rows = warmup.report()
+if warmup_rows:
+    st.dataframe(pd.DataFrame(warmup_rows).set_index("step"), width="stretch")
+else:
+    st.info("워밍업이 아직 끝나지 않았거나 실행되지 않았습니다.")
+
+st.caption("백분위수는 히스토그램 구간(1.25배 간격) 상한으로 근사한 값입니다.")
+
+st.subheader("🚦 쓰기 속도 제한")
+st.dataframe(pd.DataFrame(rate_limit.stats()).set_index("limiter"), width="stretch")
+st.caption("dropped_client = client 별 한도 초과로 버린 쓰기, dropped_global = 전체 한도 초과로 버린 쓰기 (이 프로세스 기준)")
+
+st.subheader("🧠 메모리")
+rss = memory_budget.rss_mb()
+if rss is not None:
+    st.metric("프로세스 RSS", f"{rss:.0f}MB")
+st.dataframe(pd.DataFrame(memory_budget.cache_rows()).set_index("cache"), width="stretch")
+session_rows = memory_budget.session_rows()
+if session_rows:
+    df_sessions = pd.DataFrame(session_rows).set_index("session")
+    st.dataframe(df_sessions, width="stretch")
+    st.caption(
+        f"세션 {len(df_sessions)}개 · session_state {df_sessions['state_mb'].sum():.2f}MB · "
+        f"세션 캐시 {df_sessions['cache_mb'].sum():.2f}MB "
+        f"(세션당 상한 {memory_budget.SESSION_MAX_MB:g}MB, 전체 {memory_budget.SESSIONS_MAX_MB:g}MB)"
+    )
+st.caption("크기는 객체를 따라가며 잰 추정치입니다 (pandas 는 deep memory_usage, numpy/Arrow 는 버퍼 크기).")
+
+if st.button("통계 초기화"):
+    perf.reset()
+    st.rerun()
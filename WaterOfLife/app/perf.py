@@ -0,0 +1,127 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 지연 시간 히스토그램 구간 (ms) - 0.05ms ~ 약 60초, 구간마다 1.25배
+BUCKET_BOUNDS_MS = [0.05 * 1.25 ** i for i in range(64)]
+
+
+# ---------------------------- #
+#        SPAN 통계
+# ---------------------------- #
+
+class SpanStats:
+    """span 하나의 호출 수 / 오류 수 / 지연 시간 히스토그램 (프로세스 메모리)"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def record(self, elapsed_ms: float, error: bool = False):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.buckets[bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        if error:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        """히스토그램 구간 상한으로 근사한 q 분위수 (ms)"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+
+_spans = {}
+_lock = threading.Lock()
+
+
+def _stats(name: str) -> SpanStats:
+    stats = _spans.get(name)
+    if stats is None:
+        with _lock:
+            stats = _spans.setdefault(name, SpanStats())
+    return stats
+
+
+def record(name: str, elapsed_ms: float, error: bool = False):
+    stats = _stats(name)
+    with _lock:
+        stats.record(elapsed_ms, error)
+
+
+def count_error(name: str):
+    """예외를 내부에서 삼키는 함수(Supabase 호출 등)의 오류만 따로 집계"""
+    stats = _stats(name)
+    with _lock:
+        stats.errors += 1
+
+
+# ---------------------------- #
+#        SPAN / DECORATOR
+# ---------------------------- #
+
+@contextmanager
+def span(name: str):
+    """with span("이름"): ... 구간의 지연 시간을 기록
+
+    st.stop()/st.rerun() 같은 Streamlit 제어 예외(BaseException)는 오류로 세지 않음
+    """
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        record(name, (time.perf_counter() - start) * 1000, error)
+
+
+def timed(name: str):
+    """함수 전체를 span 으로 감싸는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---------------------------- #
+#        조회 (관리자 페이지용)
+# ---------------------------- #
+
+def snapshot():
+    """span 별 요약 (이름 순)"""
+    with _lock:
+        rows = []
+        for name, stats in sorted(_spans.items()):
+            rows.append({
+                "span": name,
+                "calls": stats.count,
+                "errors": stats.errors,
+                "mean_ms": round(stats.total_ms / stats.count, 2) if stats.count else 0.0,
+                "p50_ms": round(stats.percentile(0.50), 2),
+                "p95_ms": round(stats.percentile(0.95), 2),
+                "p99_ms": round(stats.percentile(0.99), 2),
+                "max_ms": round(stats.max_ms, 2),
+            })
+    return rows
+
+
+def reset():
+    with _lock:
+        _spans.clear()
@@ -0,0 +1,93 @@
+import cProfile
+import io
+import pstats
+import runpy
+import threading
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import streamlit as st
+from streamlit.runtime.scriptrunner_utils.exceptions import StopException
+
+from admin import is_admin
+from settings import DATA_DIR
+
+PROFILE_DIR = DATA_DIR / "profiles"
+
+TOP_FUNCTIONS = 25     # 시간 기준 상위 함수 개수
+TOP_ALLOCATIONS = 15   # 메모리 할당 상위 위치 개수
+
+_state = threading.local()
+
+
+# ---------------------------- #
+#        PROFILE 요청 확인
+# ---------------------------- #
+
+def profile_requested() -> bool:
+    """?profile=1 이고 관리자 토큰이 맞을 때만 True (플래그가 없으면 dict 조회 한 번으로 끝)"""
+    if st.query_params.get("profile") != "1":
+        return False
+    return is_admin()
+
+
+def maybe_profile_page(page_file: str):
+    """페이지 맨 위에서 호출. 프로파일 요청이면 페이지 전체를 프로파일러 아래에서 다시 실행"""
+    if getattr(_state, "running", False) or not profile_requested():
+        return
+
+    _state.running = True
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    stopped = False
+    try:
+        profiler.enable()
+        runpy.run_path(page_file, run_name="__main__")
+    except StopException:
+        # 페이지 안의 st.stop() - 이후에는 화면에 더 그릴 수 없으므로 파일로만 남김
+        stopped = True
+    finally:
+        # st.rerun()/switch_page 나 오류로 빠져나가도 보고서는 남김
+        profiler.disable()
+        alloc_snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        _state.running = False
+
+        report = _build_report(page_file, profiler, alloc_snapshot)
+        path = _save_report(page_file, report)
+        print("[profiler] 보고서 저장:", path)
+
+    if not stopped:
+        with st.expander("🧪 프로파일 결과 (이번 rerun)"):
+            st.caption(f"저장 위치: {path}")
+            st.code(report)
+
+    # 프로파일 실행으로 이미 화면을 그렸으므로 바깥 스크립트는 여기서 종료
+    st.stop()
+
+
+# ---------------------------- #
+#        REPORT
+# ---------------------------- #
+
+def _build_report(page_file: str, profiler: cProfile.Profile, alloc_snapshot) -> str:
+    out = io.StringIO()
+    out.write(f"# {Path(page_file).name} @ {datetime.now().isoformat()}\n\n")
+
+    out.write(f"## 상위 {TOP_FUNCTIONS}개 함수 (tottime)\n")
+    stats = pstats.Stats(profiler, stream=out)
+    stats.strip_dirs().sort_stats("tottime").print_stats(TOP_FUNCTIONS)
+
+    out.write(f"\n## 상위 {TOP_ALLOCATIONS}개 메모리 할당 (tracemalloc)\n")
+    for stat in alloc_snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+        out.write(f"{stat}\n")
+    return out.getvalue()
+
+
+def _save_report(page_file: str, report: str) -> Path:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = PROFILE_DIR / f"{Path(page_file).stem}-{stamp}.txt"
+    path.write_text(report, encoding="utf-8")
+    return path
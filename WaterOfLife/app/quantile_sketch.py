@@ -0,0 +1,81 @@
+import math
+
+
+class QuantileSketch:
+    """값 분포를 로그 간격 구간별 개수로만 기억하는 분위수 스케치 (DDSketch 방식)
+
+    구간 i = (gamma^(i-1), gamma^i] 라서 어떤 분위수든 상대 오차 alpha 이내. 구간 수는 값의 범위(로그)에만 비례하고,
+    두 스케치는 구간별 개수를 더하기만 하면 합쳐짐 (워커/날짜별 스케치를 나중에 합침)
+    """
+
+    def __init__(self, alpha: float = 0.01):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}   # 구간 번호 → 개수
+        self.zeros = 0      # 0 이하 값 (로그 구간에 넣을 수 없음)
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+
+    def add(self, value: float, n: int = 1):
+        if value <= 0:
+            self.zeros += n
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.count += n
+        self.total += value * n
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.alpha != self.alpha:
+            raise ValueError(f"alpha 가 다른 스케치는 합칠 수 없음: {self.alpha} != {other.alpha}")
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> float:
+        """q 분위수 추정값 (비어 있으면 None). 구간의 중간값이라 실제 값과의 상대 오차는 alpha 이내"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return min(2 * self.gamma ** index / (self.gamma + 1), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else None
+
+    # ---------- 저장 ----------
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "buckets": {str(index): n for index, n in self.buckets.items()},
+            "zeros": self.zeros,
+            "count": self.count,
+            "total": self.total,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data["alpha"])
+        sketch.buckets = {int(index): n for index, n in data["buckets"].items()}
+        sketch.zeros = data["zeros"]
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        sketch.max = data["max"]
+        return sketch
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+STRIPES = 16   # client 별 버킷을 나눠 담는 잠금 수 - 서로 다른 client 는 거의 같은 잠금을 기다리지 않음
+
+_limiters = []   # 관리자 페이지에 보여줄 모든 limiter (생성 순서)
+
+
+class TokenBucket:
+    """초당 rate 개씩 채워지고 최대 burst 개까지 쌓이는 토큰 버킷 (잠금은 호출 측에서)"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def idle_full(self, now: float) -> bool:
+        """지금 다시 채우면 가득 찰 만큼 쉬었는지 (지워도 결과가 같음)"""
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+
+class RateLimiter:
+    """client 별 토큰 버킷 + 전체 상한 (프로세스 메모리, 워커마다 따로)
+
+    rate 가 0 이면 그 단계는 제한 없음. 가득 찬 버킷은 기본값과 같으므로 오래 쉰 client 는 지워서 메모리를 제한
+    """
+
+    def __init__(self, name: str, client_rate: float, client_burst: float,
+                 global_rate: float, global_burst: float, max_clients: int = 50_000):
+        self.name = name
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_clients_per_stripe = max(1, max_clients // STRIPES)
+
+        self._stripes = [(threading.Lock(), OrderedDict()) for _ in range(STRIPES)]
+        self._global = TokenBucket(global_rate, global_burst, time.monotonic()) if global_rate else None
+        self._global_lock = threading.Lock()
+
+        self.allowed = 0
+        self.dropped_client = 0
+        self.dropped_global = 0
+        _limiters.append(self)
+
+    def _take_client(self, client_id, now: float) -> bool:
+        lock, buckets = self._stripes[hash(client_id) % STRIPES]
+        with lock:
+            bucket = buckets.get(client_id)
+            if bucket is None:
+                bucket = buckets[client_id] = TokenBucket(self.client_rate, self.client_burst, now)
+            else:
+                buckets.move_to_end(client_id)
+            ok = bucket.take(now)
+
+            # 가장 오래 안 쓴 버킷부터 - 가득 찼거나 개수를 넘으면 지움
+            while len(buckets) > 1:
+                oldest = next(iter(buckets.values()))
+                if not (oldest.idle_full(now) or len(buckets) > self.max_clients_per_stripe):
+                    break
+                buckets.popitem(last=False)
+            return ok
+
+    def allow(self, client_id) -> bool:
+        """이번 쓰기를 해도 되면 True. 막힌 쓰기는 이유별로 셈 (카운터는 대략값 - 잠금 없이 +1)
+
+        client_id 가 None 이면 전체 상한만 적용
+        """
+        now = time.monotonic()
+        if self.client_rate and client_id is not None and not self._take_client(client_id, now):
+            self.dropped_client += 1
+            return False
+        if self._global is not None:
+            with self._global_lock:
+                ok = self._global.take(now)
+            if not ok:
+                self.dropped_global += 1
+                return False
+        self.allowed += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "limiter": self.name,
+            "allowed": self.allowed,
+            "dropped_client": self.dropped_client,
+            "dropped_global": self.dropped_global,
+            "tracked_clients": sum(len(buckets) for _, buckets in self._stripes),
+        }
+
+
+def stats() -> list:
+    """모든 limiter 의 허용/차단 수 (관리자 페이지용)"""
+    return [limiter.stats() for limiter in _limiters]
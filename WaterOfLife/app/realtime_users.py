@@ -1,9 +1,9 @@
-from supabase_client import supabase
+from supabase_client import get_supabase
 import uuid
 import streamlit as st
 from datetime import datetime, timezone, timedelta
-import httpx  # ReadError 잡기 위해 필요
 import time
+import perf
 
 TIMEOUT = 60  # 1분
 
@@ -23,19 +23,21 @@ def get_user_id():
 #        HEARTBEAT
 # ---------------------------- #
 
+@perf.timed("heartbeat")
 def heartbeat():
     """현재 사용자 heartbeat 갱신"""
     user_id = get_user_id()
     now = datetime.now(timezone.utc).isoformat()
 
     try:
-        supabase.table("realtime_users").upsert({
+        get_supabase().table("realtime_users").upsert({
             "user_id": user_id,
             "last_seen": now,
         }).execute()
     except Exception as e:
         # Supabase 오류 → 앱 죽지 않도록 무시
         print("[heartbeat] ERROR:", repr(e))
+        perf.count_error("heartbeat")
 
     return user_id
 
@@ -44,14 +46,16 @@ def heartbeat():
 #        CLEANUP (안전 버전)
 # ---------------------------- #
 
+@perf.timed("cleanup")
 def cleanup():
     """60초 이상 지난 사용자 삭제 (안전 처리)"""
     now = datetime.now(timezone.utc)
 
     try:
-        result = supabase.table("realtime_users").select("*").execute()
+        result = get_supabase().table("realtime_users").select("*").execute()
     except Exception as e:
         print("[cleanup] 오류 발생 - cleanup 스킵:", repr(e))
+        perf.count_error("cleanup")
         return  # 실패해도 앱은 계속 돌아가야 함
 
     # 정상 조회되면 정리 로직 수행
@@ -65,12 +69,13 @@ def cleanup():
 
         if diff > TIMEOUT:
             try:
-                supabase.table("realtime_users") \
+                get_supabase().table("realtime_users") \
                     .delete() \
                     .eq("user_id", row["user_id"]) \
                     .execute()
             except Exception as e:
                 print("[cleanup] 삭제 실패:", repr(e))
+                perf.count_error("cleanup")
                 continue
 
 
@@ -98,6 +103,24 @@ def cleanup_throttled(interval_seconds=30):
 _last_active_users = None
 _last_active_users_time = 0
 
+
+def count_active_users() -> int:
+    """캐시 없이 Supabase 에서 바로 조회 (실패하면 예외) - active_history 기록 스레드용
+
+    cleanup() 은 통계 페이지가 열려 있을 때만 돌므로 지워지지 않은 오래된 행은 last_seen 으로 거름.
+    행을 받아 오지 않고 개수만 받음 (head=True)
+    """
+    since = (datetime.now(timezone.utc) - timedelta(seconds=TIMEOUT)).isoformat()
+    result = (
+        get_supabase().table("realtime_users")
+        .select("user_id", count="exact", head=True)
+        .gte("last_seen", since)
+        .execute()
+    )
+    return result.count or 0
+
+
+@perf.timed("get_active_users")
 def get_active_users():
     global _last_active_users, _last_active_users_time
     now = time.time()
@@ -107,10 +130,10 @@ def get_active_users():
         return _last_active_users
 
     try:
-        result = supabase.table("realtime_users").select("user_id").execute()
-        count = len(result.data)
+        count = count_active_users()
     except Exception as e:
         print("[get_active_users] 조회 실패:", repr(e))
+        perf.count_error("get_active_users")
         return _last_active_users or 0   # 실패 시 마지막 값 유지
 
     # 캐싱
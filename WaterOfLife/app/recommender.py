@@ -0,0 +1,121 @@
+import json
+
+from perf import timed
+from settings import get_setting
+
+# 설문 보기 (01_survey.py 와 벤치마크/튜닝 도구가 함께 사용)
+COMPANIONS = ["혼자", "연인/썸", "친구/동기", "직장동료/회식"]
+MOODS = [
+    "가볍게 한잔 마시고 싶어요",
+    "진지한 대화가 좋아요",
+    "텐션 업! 신나게 마시고 싶어요",
+    "조용히 분위기만 즐기고 싶어요",
+    "선물 할거에요"
+]
+ABV_MIN, ABV_MAX = 5, 60
+TASTES = [
+    "달콤한 맛이 좋아요",
+    "강하고 묵직한 맛이 좋아요",
+    "상큼/깔끔한 스타일이 좋아요",
+    "잘 모르겠어요, 추천에 맡길래요",
+]
+FOODS = [
+    "한식 안주 (찌개, 전, 튀김, 고기 등)",
+    "일식/해산물 (초밥, 사시미 등)",
+    "서양식 (파스타, 스테이크, 치즈 등)",
+    "가벼운 안주/간단한 스낵",
+    "안주 없이 술 위주로 마실래요",
+]
+# 추천 결과 카테고리 (drink_catalog.json 에 같은 이름의 소개가 있어야 함)
+CATEGORIES = ["위스키", "사케", "전통주", "와인"]
+
+
+# 도수 구간 (설문은 정수 도수, 점수표는 구간별)
+ABV_BANDS = ["10도 이하", "11~30도", "31도 이상"]
+
+
+def abv_band(abv) -> str:
+    if abv <= 10:
+        return ABV_BANDS[0]
+    if abv <= 30:
+        return ABV_BANDS[1]
+    return ABV_BANDS[2]
+
+
+# 질문 → 보기 → 카테고리별 가산점 (tools/tune_recommender.py 로 다시 맞출 수 있음)
+DEFAULT_WEIGHTS = {
+    # 1) 동반자
+    "companion": {
+        "혼자": {"위스키": 2, "전통주": 1},
+        "연인/썸": {"와인": 2, "사케": 1},
+        "친구/동기": {"전통주": 2, "와인": 1},
+        "직장동료/회식": {"전통주": 2, "위스키": 1},
+    },
+    # 2) 분위기/목적
+    "mood": {
+        "가볍게 한잔 마시고 싶어요": {"사케": 1, "전통주": 1, "와인": 1, "위스키": 1},
+        "진지한 대화가 좋아요": {"위스키": 2, "와인": 2},
+        "텐션 업! 신나게 마시고 싶어요": {"위스키": 1, "전통주": 2},
+        "조용히 분위기만 즐기고 싶어요": {"와인": 2, "사케": 2},
+        "선물 할거에요": {"와인": 2, "위스키": 2},
+    },
+    # 3) 도수
+    "abv": {
+        "10도 이하": {"전통주": 1, "와인": 1},
+        "11~30도": {"사케": 2, "와인": 2, "전통주": 1},
+        "31도 이상": {"위스키": 2},
+    },
+    # 4) 맛/스타일 - "잘 모르겠어요"면 다른 요소로만 판단
+    "taste_pref": {
+        "달콤한 맛이 좋아요": {"사케": 2, "전통주": 2, "와인": 1, "위스키": 1},
+        "강하고 묵직한 맛이 좋아요": {"위스키": 2, "와인": 1},
+        "상큼/깔끔한 스타일이 좋아요": {"사케": 2, "전통주": 1, "와인": 1},
+        "잘 모르겠어요, 추천에 맡길래요": {},
+    },
+    # 5) 안주/음식
+    "food": {
+        "한식 안주 (찌개, 전, 튀김, 고기 등)": {"전통주": 3},
+        "일식/해산물 (초밥, 사시미 등)": {"사케": 3},
+        "서양식 (파스타, 스테이크, 치즈 등)": {"와인": 3},
+        "가벼운 안주/간단한 스낵": {"위스키": 2, "와인": 1},
+        "안주 없이 술 위주로 마실래요": {"위스키": 2},
+    },
+}
+
+
+def load_weights(path) -> dict:
+    """튜닝 도구가 저장한 점수표(JSON) - 빠진 질문/보기는 기본값 사용"""
+    with open(path, encoding="utf-8") as f:
+        tuned = json.load(f).get("weights", {})
+    return {
+        question: {option: tuned.get(question, {}).get(option, bonus) for option, bonus in options.items()}
+        for question, options in DEFAULT_WEIGHTS.items()
+    }
+
+
+_weights_file = get_setting("RECOMMENDER_WEIGHTS_FILE", "")
+WEIGHTS = load_weights(_weights_file) if _weights_file else DEFAULT_WEIGHTS
+
+
+@timed("recommend_drink")
+def recommend_drink(companion, mood, abv, taste_pref, food, weights=None):
+    """
+    5개 질문을 바탕으로 위스키/사케/전통주/와인 중 하나를 추천하는 점수 로직
+    """
+    weights = weights or WEIGHTS
+    scores = {category: 0 for category in CATEGORIES}
+
+    answers = {
+        "companion": companion,
+        "mood": mood,
+        "abv": abv_band(abv),
+        "taste_pref": taste_pref,
+        "food": food,
+    }
+    for question, answer in answers.items():
+        for category, bonus in weights[question].get(answer, {}).items():
+            scores[category] += bonus
+
+    # 동점이면 CATEGORIES 순서가 앞선 쪽
+    recommended = max(scores, key=scores.get)
+    return recommended, scores
@@ -0,0 +1,30 @@
+import os
+from pathlib import Path
+
+import streamlit as st
+
+
+def get_setting(name: str, default=None):
+    """설정값 조회: st.secrets → 환경변수 → 기본값 순서 (기본값의 타입으로 변환)"""
+    value = None
+    try:
+        if name in st.secrets:
+            value = st.secrets[name]
+    except Exception:
+        # secrets.toml 이 없는 환경 (로컬 스크립트, 벤치마크 등)
+        pass
+
+    if value is None:
+        value = os.environ.get(name)
+    if value is None:
+        return default
+
+    if isinstance(default, bool):
+        return str(value).strip().lower() in ("1", "true", "yes", "on")
+    if default is not None and not isinstance(value, type(default)):
+        return type(default)(value)
+    return value
+
+
+ROOT_DIR = Path(__file__).resolve().parents[1]   # .../WaterOfLife
+DATA_DIR = Path(get_setting("WOL_DATA_DIR", str(ROOT_DIR / "data")))   # 모든 페이지가 같은 data 폴더 사용
@@ -0,0 +1,120 @@
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from pathlib import Path
+
+# 헤더: magic, 형식 버전, 순번(seq), 본문 길이, 게시 시각(epoch)
+# seq 가 홀수면 쓰는 중 - 읽는 쪽은 앞뒤 seq 가 같고 짝수일 때만 본문을 믿음 (seqlock)
+HEADER = struct.Struct("<4sIQQd")
+MAGIC = b"WOLS"
+FORMAT_VERSION = 1
+READ_RETRIES = 5
+
+
+class SharedSnapshot:
+    """여러 프로세스가 같은 파일을 mmap 해서 공유하는 스냅샷 (게시자 1개, 읽는 쪽 여러 개)
+
+    읽는 쪽은 헤더의 seq 만 보고 바뀌었을 때만 본문을 역직렬화함
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._mm = None
+        self._mm_writable = False
+        self._lock = threading.Lock()
+        self._cached_seq = None
+        self._cached = None
+
+    # ---------- 공통 ----------
+
+    def _map(self, min_size: int = 0, writable: bool = False):
+        """파일을 (다시) mmap - 게시자가 파일을 키웠으면 새 크기로"""
+        # 같은 프로세스가 읽기용으로 먼저 map 했으면 게시할 때 쓰기용으로 다시 map
+        if self._mm is not None and len(self._mm) >= max(min_size, HEADER.size) and self._mm_writable >= writable:
+            return self._mm
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+        flags = os.O_RDWR | os.O_CREAT if writable else os.O_RDONLY
+        try:
+            fd = os.open(self.path, flags, 0o644)
+        except FileNotFoundError:
+            return None
+        try:
+            size = os.fstat(fd).st_size
+            if writable and size < max(min_size, HEADER.size):
+                size = max(min_size, HEADER.size)
+                os.ftruncate(fd, size)
+            if size < HEADER.size:
+                return None
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self._mm = mmap.mmap(fd, size, access=access)
+            self._mm_writable = writable
+        finally:
+            os.close(fd)
+        return self._mm
+
+    def _header(self, mm):
+        magic, version, seq, length, published_at = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return None
+        return seq, length, published_at
+
+    # ---------- 게시자 ----------
+
+    def publish(self, snapshot) -> int:
+        """스냅샷을 새 버전으로 게시하고 seq 반환 (게시자 프로세스 하나만 호출해야 함)"""
+        payload = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            mm = self._map(HEADER.size + len(payload), writable=True)
+            header = self._header(mm)
+            seq = header[0] if header else 0
+            seq += 1 if seq % 2 == 0 else 0
+
+            HEADER.pack_into(mm, 0, MAGIC, FORMAT_VERSION, seq, 0, 0.0)   # 쓰는 중 (홀수)
+            mm[HEADER.size:HEADER.size + len(payload)] = payload
+            seq += 1
+            HEADER.pack_into(mm, 0, MAGIC, FORMAT_VERSION, seq, len(payload), time.time())
+            mm.flush()
+            return seq
+
+    # ---------- 읽는 쪽 ----------
+
+    @property
+    def cached(self):
+        """마지막으로 역직렬화한 스냅샷 (메모리 집계용, 없으면 None)"""
+        return self._cached
+
+    def read(self):
+        """(스냅샷, 게시 시각) - 아직 게시된 적 없거나 계속 쓰는 중이면 None"""
+        with self._lock:
+            for _ in range(READ_RETRIES):
+                mm = self._map()
+                header = mm and self._header(mm)
+                if not header or header[0] == 0:
+                    return None
+                seq, length, published_at = header
+                if seq % 2:
+                    time.sleep(0.001)
+                    continue
+                if seq == self._cached_seq:
+                    return self._cached, published_at
+
+                mm = self._map(HEADER.size + length)
+                view = memoryview(mm)[HEADER.size:HEADER.size + length]
+                try:
+                    snapshot = pickle.loads(view)
+                except Exception:
+                    snapshot = None   # 읽는 도중 덮어써진 경우 - 아래 seq 확인에서 재시도
+                finally:
+                    view.release()
+
+                if self._header(mm)[0] == seq and snapshot is not None:
+                    self._cached_seq, self._cached = seq, snapshot
+                    return snapshot, published_at
+            return None
@@ -0,0 +1,102 @@
+import hashlib
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+from images import APP_DIR, IMG_DIR, resized_image
+from perf import timed
+from settings import get_setting
+
+# Streamlit 정적 파일 폴더 (server.enableStaticServing=true 이면 /app/static/... 으로 제공)
+STATIC_DIR = APP_DIR / "static"
+ASSET_DIR = STATIC_DIR / "img"   # 내용 해시 이름으로 만든 축소본 (생성물 - git 에 올리지 않음)
+
+# 이미지 URL 앞부분. 아래 전용 서버나 CDN/리버스 프록시를 쓰면 그 주소(http...)로 바꿈
+# 기본값(/app/static)은 Streamlit 이 Cache-Control: no-cache 로 내려보내므로 immutable 캐시는 적용되지 않음 (재방문마다 304 재검증)
+STATIC_BASE_URL = get_setting("STATIC_BASE_URL", "/app/static").rstrip("/")
+# 0 이 아니면 이 포트에서 immutable 캐시 헤더를 붙이는 작은 정적 서버를 띄움
+STATIC_SERVER_PORT = get_setting("STATIC_SERVER_PORT", 0)
+# 기본은 이 서버 안에서만 (리버스 프록시 뒤). 브라우저가 이 포트로 바로 받게 하려면 0.0.0.0
+STATIC_SERVER_HOST = get_setting("STATIC_SERVER_HOST", "127.0.0.1")
+
+MAX_WIDTH = 1400   # width 없이 컨테이너 폭으로 그리는 이미지 (centered 레이아웃 약 700px × 2)
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# 홈 화면 이미지 (워밍업에서 미리 생성)
+HOME_IMAGES = ("0_LiqureMate.png", "2_MainBanner.png", "mainpage_warehouse.png")
+
+
+def publish_image(name: str, width: int = None, height: int = None) -> str:
+    """images/<name> 축소본을 static/img/<이름>.<해시>.<확장자> 로 저장하고 파일 이름 반환
+
+    내용이 바뀌면 이름도 바뀌므로 브라우저/프록시가 영구 캐시해도 안전. 원본이 없으면 None
+    """
+    path = IMG_DIR / name
+    if not path.exists():
+        return None
+    # 레티나 화면 대비 표시 크기의 2배
+    if height:
+        data = resized_image(path, height=height * 2)
+    else:
+        data = resized_image(path, width=(width or MAX_WIDTH // 2) * 2)
+    ext = ".png" if data.startswith(b"\x89PNG") else ".jpg"
+    filename = f"{path.stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+    target = ASSET_DIR / filename
+    if not target.exists():
+        ASSET_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(target)
+    return filename
+
+
+@timed("asset_url")
+@st.cache_resource(show_spinner=False)
+def asset_url(name: str, width: int = None, height: int = None) -> str:
+    """st.image / <img> 에 바로 넣을 수 있는 캐시 가능한 URL (프로세스당 한 번 생성). 원본이 없으면 None"""
+    filename = publish_image(name, width, height)
+    if filename is None:
+        return None
+    if STATIC_SERVER_PORT:
+        start_static_server()
+    return f"{STATIC_BASE_URL}/img/{filename}"
+
+
+# ---------------------------- #
+#        전용 정적 서버 (선택)
+# ---------------------------- #
+
+class _ImmutableHandler(SimpleHTTPRequestHandler):
+    """해시 이름 파일에 1년 immutable 캐시 헤더를 붙이는 정적 파일 핸들러"""
+
+    def end_headers(self):
+        self.send_header("Cache-Control", IMMUTABLE)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        super().end_headers()
+
+    def list_directory(self, path):
+        self.send_error(404)   # 폴더 목록은 보여주지 않음
+        return None
+
+    def log_message(self, format, *args):
+        pass   # 요청마다 로그를 찍지 않음
+
+
+@st.cache_resource(show_spinner=False)
+def start_static_server():
+    """프로세스당 한 번 시도 - 같은 호스트의 다른 워커가 이미 포트를 잡았으면 그 서버를 같이 씀"""
+    STATIC_DIR.mkdir(parents=True, exist_ok=True)
+    handler = partial(_ImmutableHandler, directory=str(STATIC_DIR))
+    try:
+        server = ThreadingHTTPServer((STATIC_SERVER_HOST, STATIC_SERVER_PORT), handler)
+    except OSError as e:
+        print(f"[static_assets] {STATIC_SERVER_PORT} 포트 사용 불가 (다른 워커가 제공 중일 수 있음):", repr(e))
+        return None
+    threading.Thread(target=server.serve_forever, name="static-server", daemon=True).start()
+    print(f"[static_assets] http://{STATIC_SERVER_HOST}:{STATIC_SERVER_PORT}/")
+    if not STATIC_BASE_URL.startswith("http"):
+        print("[static_assets] STATIC_BASE_URL 이 이 서버 주소가 아니라 이미지는 여전히 캐시 헤더 없는 Streamlit 경로로 나갑니다.")
+    return server
@@ -0,0 +1,208 @@
+"""읽기 전용 통계 API (BI 도구 / 매장 디스플레이용)
+
+    GET /stats?period=30                       모든 집계를 JSON 하나로
+    GET /stats/<section>?period=7&format=arrow 집계 하나를 JSON 또는 Arrow IPC stream 으로
+    GET /health
+
+section: funnel, dwell_buckets, visit_days, mood_pivot, food, category_conversion, page_views
+period : 7, 30(기본, 보관 기간), all
+이미 계산해 둔 통계 스냅샷(stats_snapshot)만 읽으므로 Streamlit 페이지를 실행하지 않습니다.
+ETag 는 집계 내용의 해시라 내용이 그대로면(If-None-Match) 304 를 돌려줍니다.
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import streamlit as st
+
+from event_store import RETENTION_DAYS
+from perf import count_error, span
+from settings import get_setting
+
+STATS_API_HOST = get_setting("STATS_API_HOST", "127.0.0.1")   # 기본은 이 서버 안에서만 접근 가능
+STATS_API_PORT = get_setting("STATS_API_PORT", 8503)          # 0 이면 띄우지 않음
+PAGE_VIEWS_TTL = 30.0                                          # 조회수는 Supabase 에서 가져오므로 이 주기로만 갱신
+
+# 스냅샷에서 그대로 꺼내는 집계 (page_views 는 Supabase 에서 따로)
+SECTIONS = ("funnel", "dwell_buckets", "visit_days", "mood_pivot", "food", "category_conversion")
+# 통계 페이지와 같은 기간 (stats_snapshot.PERIOD_DAYS - pandas 를 늦게 import 하려고 여기서 다시 정의)
+PERIODS = {str(days) if days else "all": days for days in dict.fromkeys((7, RETENTION_DAYS, None))}
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+
+_page_views = {"at": 0.0, "frame": None}
+_page_views_lock = threading.Lock()
+
+
+def _page_views_frame():
+    """페이지별 조회수 (PAGE_VIEWS_TTL 동안 재사용)"""
+    import pandas as pd
+    from page_counter import get_all_page_views
+
+    with _page_views_lock:
+        if _page_views["frame"] is None or time.time() - _page_views["at"] > PAGE_VIEWS_TTL:
+            _page_views["frame"] = pd.DataFrame(get_all_page_views() or [])
+            _page_views["at"] = time.time()
+        return _page_views["frame"], _page_views["at"]
+
+
+def _section(snapshot: dict, name: str):
+    """(DataFrame, 내용 해시) - 없는 집계면 (None, None)"""
+    if name == "page_views":
+        try:
+            frame, _ = _page_views_frame()
+        except Exception as e:
+            # Supabase 장애가 나머지 집계까지 막지 않도록
+            print("[stats_api] 조회수 불러오기 실패:", repr(e))
+            count_error("stats_api.page_views")
+            return None, None
+        return frame, _frame_version(frame)
+    frame = snapshot.get(name)
+    if frame is None:
+        return None, None
+    if name == "mood_pivot":
+        frame = frame.reset_index()
+    return frame, _frame_version(frame)
+
+
+def _frame_version(frame) -> str:
+    """집계 내용만으로 만든 해시 - 게시자가 같은 데이터로 다시 게시해도(MAX_AGE) 값이 같으면 ETag 도 같음"""
+    import pandas as pd
+
+    digest = hashlib.sha1(repr((list(frame.columns), list(frame.dtypes.astype(str)))).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _records(frame) -> list:
+    return json.loads(frame.to_json(orient="records", force_ascii=False))
+
+
+def _to_arrow(frame) -> bytes:
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _etag(*parts) -> str:
+    return '"' + hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:20] + '"'
+
+
+class StatsApiHandler(BaseHTTPRequestHandler):
+    server_version = "WaterOfLifeStats/1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ["health"]:
+            return self._send(200, b'{"ok": true}', "application/json")
+        if not parts or parts[0] != "stats" or len(parts) > 2:
+            return self._error(404, "not found")
+
+        period_key = query.get("period", [str(RETENTION_DAYS)])[0]
+        if period_key not in PERIODS:
+            return self._error(400, f"period must be one of {sorted(PERIODS)}")
+        fmt = query.get("format", ["arrow" if ARROW_TYPE in self.headers.get("Accept", "") else "json"])[0]
+
+        from stats_snapshot import load_snapshot
+        with span("stats_api.request"):
+            snapshot = load_snapshot(PERIODS[period_key])
+            if len(parts) == 1:
+                return self._send_all(snapshot, period_key)
+            return self._send_section(snapshot, parts[1], period_key, fmt)
+
+    def _send_all(self, snapshot: dict, period_key: str):
+        if "built_at" not in snapshot:
+            return self._error(503, "snapshot not ready")
+        sections = {name: _section(snapshot, name) for name in SECTIONS + ("page_views",)}
+        frames = {name: frame for name, (frame, _) in sections.items()}
+        etag = _etag("all", period_key, snapshot.get("returning"), snapshot.get("survey_count"),
+                     *(f"{name}:{version}" for name, (_, version) in sections.items()))
+        if self._not_modified(etag):
+            return
+        body = {
+            "period": period_key,
+            "built_at": snapshot["built_at"].isoformat(),
+            "returning": snapshot.get("returning"),
+            "survey_count": snapshot.get("survey_count"),
+            **{name: _records(frame) for name, frame in frames.items() if frame is not None},
+        }
+        self._send(200, json.dumps(body, ensure_ascii=False, default=str).encode(), "application/json", etag)
+
+    def _send_section(self, snapshot: dict, name: str, period_key: str, fmt: str):
+        if name not in SECTIONS and name != "page_views":
+            return self._error(404, f"unknown section {name!r}")
+        if fmt not in ("json", "arrow"):
+            return self._error(400, "format must be json or arrow")
+        frame, version = _section(snapshot, name)
+        if frame is None:
+            return self._error(404, f"no data for {name!r}")
+
+        etag = _etag(name, period_key, fmt, version)
+        if self._not_modified(etag):
+            return
+        if fmt == "arrow":
+            return self._send(200, _to_arrow(frame), ARROW_TYPE, etag)
+        body = json.dumps(_records(frame), ensure_ascii=False).encode()
+        self._send(200, body, "application/json", etag)
+
+    # ---------- 응답 ----------
+
+    def _not_modified(self, etag: str) -> bool:
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return True
+        return False
+
+    def _send(self, status: int, body: bytes, content_type: str, etag: str = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type + ("; charset=utf-8" if content_type.endswith("json") else ""))
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")   # 항상 ETag 로 재검증
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str):
+        self._send(status, json.dumps({"error": message}).encode(), "application/json")
+
+    def log_message(self, format, *args):
+        pass   # 요청마다 로그를 찍지 않음
+
+
+def serve(host: str = STATS_API_HOST, port: int = STATS_API_PORT):
+    server = ThreadingHTTPServer((host, port), StatsApiHandler)
+    server.daemon_threads = True
+    return server
+
+
+@st.cache_resource(show_spinner=False)
+def start_stats_api():
+    """프로세스당 한 번 API 서버 시작 - 같은 호스트의 다른 워커가 이미 포트를 잡았으면 건너뜀"""
+    if not STATS_API_PORT:
+        return None
+    try:
+        server = serve()
+    except OSError as e:
+        print(f"[stats_api] {STATS_API_PORT} 포트 사용 불가 (다른 워커가 제공 중일 수 있음):", repr(e))
+        return None
+    threading.Thread(target=server.serve_forever, name="stats-api", daemon=True).start()
+    print(f"[stats_api] http://{STATS_API_HOST}:{STATS_API_PORT}/stats")
+    return server
+
+
+if __name__ == "__main__":
+    # 단독 실행: python WaterOfLife/app/stats_api.py
+    print(f"[stats_api] http://{STATS_API_HOST}:{STATS_API_PORT}/stats")
+    serve().serve_forever()
@@ -0,0 +1,353 @@
+import numpy as np
+import pandas as pd
+
+from perf import span
+
+# 설문 완료 → 통계 진입 소요 시간 구간
+DWELL_BINS = [0, 10, 20, 30, 60, 120, 300, 600, 999999]
+DWELL_LABELS = [
+    "0~10초", "10~20초", "20~30초", "30~60초",
+    "1~2분", "2~5분", "5~10분", "10분 이상"
+]
+
+FUNNEL_ORDER = ["유입(홈)", "설문 완료", "구매 버튼 클릭"]
+
+# 표본 추출된 이벤트(EVENT_SAMPLE_RATES)가 있을 때 추정치 옆에 붙이는 95% 오차 폭
+ERROR_COLUMN = "오차(±, 95%)"
+Z_95 = 1.96
+
+
+def ratio(part, whole):
+    return (part / whole * 100) if whole > 0 else 0.0
+
+
+# ---------------------------- #
+#        EVENTS
+# ---------------------------- #
+
+def prepare_events(events: pd.DataFrame) -> pd.DataFrame:
+    """timestamp 문자열 → datetime (컬럼이 없으면 그대로)"""
+    if "timestamp" in events.columns:
+        events["timestamp"] = pd.to_datetime(events["timestamp"], format="ISO8601")
+    return events
+
+
+# ---------------------------- #
+#        표본 가중치
+# ---------------------------- #
+
+def is_sampled(events: pd.DataFrame) -> bool:
+    return "weight" in events.columns and bool((pd.to_numeric(events["weight"], errors="coerce") > 1).any())
+
+
+def _row_weights(events: pd.DataFrame) -> pd.Series:
+    """행별 weight (= 1/표본 비율). 컬럼이 없는 예전 로그와 빈 값은 1"""
+    if "weight" not in events.columns:
+        return pd.Series(1.0, index=events.index)
+    return pd.to_numeric(events["weight"], errors="coerce").fillna(1.0)
+
+
+def client_weights(events: pd.DataFrame, event_names=None) -> pd.Series:
+    """client_id → 가중치 (= 1/그 client 가 집계에 잡힐 확률)
+
+    표본 여부는 client_id 해시 하나로 정해지므로(event_store.sample_unit)
+    - 어떤 이벤트든 하나라도 있으면 잡힘 → 남은 행 중 가장 작은 weight (event_names=None)
+    - 정해진 이벤트가 모두 있어야 잡힘 → 그 이벤트 행 중 가장 큰 weight (event_names 지정)
+    """
+    if event_names is None:
+        return _row_weights(events).groupby(events["client_id"]).min()
+    rows = events[events["event"].isin(event_names)]
+    return _row_weights(rows).groupby(rows["client_id"]).max()
+
+
+def full_sample_weights(max_weight: float, clients: pd.Index) -> pd.Series:
+    """모든 종류의 이벤트가 빠짐없이 남은 client 만 골라 쓰는 가중치 (방문일 수처럼 client 의 전체 기록이 필요한 집계용)
+
+    해시 값이 가장 낮은 표본 비율(= 1/max_weight)보다 작은 client 는 어떤 이벤트도 빠지지 않았으므로 그들만 max_weight 배로 확대
+    """
+    from event_store import sample_unit
+
+    units = np.fromiter((sample_unit(c) for c in clients), dtype=float, count=len(clients))
+    return pd.Series(np.where(units < 1 / max_weight, max_weight, 0.0), index=clients)
+
+
+def _sums(weights: pd.Series) -> tuple:
+    """Horvitz-Thompson 추정에 필요한 (weight 합, weight×(weight-1) 합) - client 묶음끼리 더할 수 있음"""
+    return float(weights.sum()), float((weights * (weights - 1)).sum())
+
+
+def weighted_counts(keys: pd.Series, weights: pd.Series, sampled: bool) -> pd.DataFrame:
+    """구간별 추정 세션 수 (표본이면 오차 폭 컬럼 추가)"""
+    grouped = pd.DataFrame({"w": weights, "v": weights * (weights - 1)}).groupby(keys, observed=False).sum()
+    counts = grouped["w"].round().astype(int).rename("세션 수").to_frame()
+    if sampled:
+        counts[ERROR_COLUMN] = (Z_95 * np.sqrt(grouped["v"])).round().astype(int)
+    return counts
+
+
+def funnel(events: pd.DataFrame) -> pd.DataFrame:
+    """유입 → 설문 완료 → 구매 버튼 클릭 (client_id 기준, 표본 이벤트는 weight 로 전체 추정)"""
+    return funnel_from_sums(funnel_sums(events), sampled=is_sampled(events))
+
+
+def funnel_sums(events: pd.DataFrame) -> np.ndarray:
+    """단계별 _sums (3×2) - client 가 겹치지 않는 묶음끼리는 그냥 더하면 전체 결과와 같음"""
+    # 유입 세션: events에 등장한 client_id 전체
+    weights = client_weights(events)
+
+    survey_clients = set(events.loc[events["event"] == "survey_completed", "client_id"])
+    purchase_clients = set(events.loc[events["event"] == "purchase_clicked", "client_id"])
+
+    return np.array([
+        _sums(weights),
+        _sums(weights.reindex(list(survey_clients))),
+        _sums(weights.reindex(list(survey_clients & purchase_clients))),   # 설문 완료한 사람 중 구매버튼까지 간 사람
+    ])
+
+
+def funnel_from_sums(sums: np.ndarray, sampled: bool) -> pd.DataFrame:
+    steps = [(total, Z_95 * np.sqrt(variance)) for total, variance in sums]
+    return funnel_frame(*steps, sampled=sampled)
+
+
+def funnel_frame(total_inflow, total_survey, total_purchase, sampled: bool = False) -> pd.DataFrame:
+    """각 단계는 (세션 수, 오차 폭) - 표본이 아니면 오차 컬럼 없음"""
+    (inflow, inflow_err), (survey, survey_err), (purchase, purchase_err) = total_inflow, total_survey, total_purchase
+    funnel_data = [
+        {"단계": "유입(홈)", "세션 수": round(inflow), "전 단계 대비 전환율(%)": 100.0,
+         ERROR_COLUMN: round(inflow_err)},
+        {"단계": "설문 완료", "세션 수": round(survey), "전 단계 대비 전환율(%)": ratio(survey, inflow),
+         ERROR_COLUMN: round(survey_err)},
+        {"단계": "구매 버튼 클릭", "세션 수": round(purchase), "전 단계 대비 전환율(%)": ratio(purchase, survey),
+         ERROR_COLUMN: round(purchase_err)},
+    ]
+    df_funnel = pd.DataFrame(funnel_data)
+    if not sampled:
+        df_funnel = df_funnel.drop(columns=[ERROR_COLUMN])
+    df_funnel["단계"] = pd.Categorical(df_funnel["단계"], categories=FUNNEL_ORDER, ordered=True)
+    return df_funnel.sort_values("단계")
+
+
+def dwell_seconds(events: pd.DataFrame) -> pd.Series:
+    """client_id별 최초 설문 완료 → 최초 통계 방문까지 걸린 시간 (초)"""
+    # 설문 완료 & 통계 방문이 모두 있는 client만 대상
+    survey_ev = events[events["event"] == "survey_completed"][["client_id", "timestamp"]]
+    stats_ev = events[events["event"] == "stats_viewed"][["client_id", "timestamp"]]
+
+    # 각 client_id별 최초 설문 완료 시각, 최초 통계 방문 시각
+    survey_first = survey_ev.groupby("client_id")["timestamp"].min()
+    stats_first = stats_ev.groupby("client_id")["timestamp"].min()
+
+    joined = (
+        pd.concat(
+            [
+                survey_first.rename("survey_time"),
+                stats_first.rename("stats_time"),
+            ],
+            axis=1
+        )
+        .dropna()  # 둘 다 있는 client만
+    )
+    if joined.empty:
+        return pd.Series(dtype=int, name="diff_sec")
+
+    return (joined["stats_time"] - joined["survey_time"]).dt.total_seconds().astype(int).rename("diff_sec")
+
+
+def dwell_summary(diff_sec: pd.Series, weights: pd.Series = None) -> pd.DataFrame:
+    summary = diff_sec.describe()[["count", "mean", "50%", "max"]]
+    if weights is not None:
+        summary["count"] = round(weights.sum())   # 개수만 전체 추정 (분포 모양은 표본 그대로)
+    return summary.rename({
+        "count": "개수",
+        "mean": "평균(초)",
+        "50%": "중앙값(초)",
+        "max": "최대(초)",
+    }).to_frame("값")
+
+
+def dwell_buckets(diff_sec: pd.Series, weights: pd.Series = None, sampled: bool = False) -> pd.DataFrame:
+    bucket = pd.cut(diff_sec, bins=DWELL_BINS, labels=DWELL_LABELS, right=False)
+    if weights is None:
+        weights = pd.Series(1.0, index=diff_sec.index)
+    bucket_counts = weighted_counts(bucket, weights, sampled).reset_index()
+    bucket_counts = bucket_counts.rename(columns={bucket_counts.columns[0]: "구간"})
+    return bucket_counts
+
+
+def visit_days(events: pd.DataFrame) -> pd.Series:
+    """client_id별 방문한 날짜 수"""
+    dates = events["timestamp"].dt.normalize()
+    return dates.groupby(events["client_id"]).nunique().rename("방문일 수")
+
+
+def returning_summary(days: pd.Series, weights: pd.Series = None) -> dict:
+    """weights 가 있으면 표본 → 전체 추정 (full_sample_weights)"""
+    if weights is None:
+        weights = pd.Series(1.0, index=days.index)
+    total_clients = round(weights.sum())
+    returning = round(weights[days >= 2].sum())
+    return {
+        "total_clients": total_clients,
+        "returning": returning,
+        "returning_rate": ratio(returning, total_clients),
+    }
+
+
+def visit_day_distribution(days: pd.Series, weights: pd.Series = None, sampled: bool = False) -> pd.DataFrame:
+    if weights is None:
+        weights = pd.Series(1.0, index=days.index)
+    dist = weighted_counts(days, weights, sampled).sort_index().reset_index()
+    dist = dist[dist["세션 수"] > 0]   # 표본 밖 client 만 있던 방문일 수는 0 → 빼기
+    return dist.rename(columns={dist.columns[0]: "방문일 수"}).reset_index(drop=True)
+
+
+# ---------------------------- #
+#        SURVEY
+# ---------------------------- #
+
+def mood_pivot(survey: pd.DataFrame) -> pd.DataFrame:
+    """분위기 × 추천 술 타입 (개수)"""
+    mood_rec = survey.groupby(["mood", "recommended"]).size().reset_index(name="count")
+    return mood_rec.pivot(index="mood", columns="recommended", values="count").fillna(0).astype(int)
+
+
+def pivot_ratio(pivot_count: pd.DataFrame) -> pd.DataFrame:
+    """분위기(mood)별 비율(%)"""
+    return (pivot_count.div(pivot_count.sum(axis=1), axis=0) * 100).round(1)
+
+
+def food_counts(survey: pd.DataFrame) -> pd.DataFrame:
+    return survey["food"].value_counts().rename_axis("안주/음식").reset_index(name="응답 수")
+
+
+# ---------------------------- #
+#        추천 → 구매 전환
+# ---------------------------- #
+
+def recommendation_index(survey: pd.DataFrame) -> pd.Series:
+    """client_id → 마지막으로 추천받은 술 (client_id 가 없는 예전 설문은 제외)"""
+    if "client_id" not in survey.columns:
+        return pd.Series(dtype=object)
+    linked = survey.dropna(subset=["client_id"])
+    return linked.drop_duplicates("client_id", keep="last").set_index("client_id")["recommended"]
+
+
+def category_conversion(index: pd.Series, events: pd.DataFrame) -> pd.DataFrame:
+    """추천 술 종류별 설문 → 구매 클릭 전환율 (client_id 해시 조인)"""
+    purchasers = events.loc[events["event"] == "purchase_clicked", "client_id"].unique()
+    df = pd.DataFrame({"추천 술": index.to_numpy(), "구매": index.index.isin(purchasers)})
+    result = (
+        df.groupby("추천 술")["구매"]
+        .agg(["size", "sum"])
+        .rename(columns={"size": "설문 세션 수", "sum": "구매 클릭 세션 수"})
+        .reset_index()
+    )
+    result["전환율(%)"] = result["구매 클릭 세션 수"] / result["설문 세션 수"] * 100
+    return result
+
+
+# ---------------------------- #
+#        부분 집계 → 합치기
+# ---------------------------- #
+
+def event_partials(events: pd.DataFrame, has_timestamp: bool, with_days: bool = True, with_dwell: bool = True) -> dict:
+    """client 가 겹치지 않는 이벤트 묶음 하나의 부분 집계 (stats_parallel 은 묶음마다 워커 프로세스에서 호출)
+
+    퍼널은 합계, 체류 시간/방문일 수는 client 별 값이라 묶음끼리 이어 붙이면 전체와 정확히 같음
+    with_days=False 이면 방문일 수는 건너뜀 (visit_tracker 에서 받음), with_dwell=False 이면 체류 시간도 (dwell_tracker)
+    """
+    with span("stats.funnel"):
+        partial = {
+            "funnel": funnel_sums(events),
+            "max_weight": float(_row_weights(events).max()) if len(events) else 1.0,
+        }
+    if has_timestamp:
+        if with_dwell:
+            with span("stats.dwell"):
+                diff_sec = dwell_seconds(events)
+                partial["diff_sec"] = diff_sec
+                partial["dwell_weights"] = client_weights(events, ["survey_completed", "stats_viewed"]).reindex(diff_sec.index)
+        if with_days:
+            with span("stats.returning"):
+                partial["days"] = visit_days(events)
+    return partial
+
+
+def merge_partials(partials: list, has_timestamp: bool, sampled: bool, days: pd.Series = None, dwell: dict = None) -> dict:
+    """event_partials 결과들 → 스냅샷의 이벤트 항목
+
+    days(visit_tracker 의 client 별 방문일 수)가 있으면 재방문 통계는 그 값 그대로 (표본 추정이 아닌 정확한 값)
+    dwell(dwell_tracker.summary)이 있으면 체류 시간 항목도 그대로
+    """
+    merged = {"funnel": funnel_from_sums(np.sum([p["funnel"] for p in partials], axis=0), sampled)}
+    if not has_timestamp:
+        return merged
+
+    if dwell is not None:
+        merged.update(dwell)
+    else:
+        diff_sec = pd.concat([p["diff_sec"] for p in partials])
+        weights = pd.concat([p["dwell_weights"] for p in partials])
+        merged["dwell_sessions"] = round(weights.sum())
+        if not diff_sec.empty:
+            merged["dwell_summary"] = dwell_summary(diff_sec, weights if sampled else None)
+            merged["dwell_buckets"] = dwell_buckets(diff_sec, weights, sampled)
+
+    if days is not None:
+        merged["returning"] = returning_summary(days)
+        merged["visit_days"] = visit_day_distribution(days)
+        return merged
+    days = pd.concat([p["days"] for p in partials])
+    weights = full_sample_weights(max(p["max_weight"] for p in partials), days.index) if sampled else None
+    merged["returning"] = returning_summary(days, weights)
+    merged["visit_days"] = visit_day_distribution(days, weights, sampled)
+    return merged
+
+
+# ---------------------------- #
+#        SNAPSHOT
+# ---------------------------- #
+
+def compute_snapshot(events: pd.DataFrame, survey: pd.DataFrame, workers: int = 1, days: pd.Series = None,
+                     dwell: dict = None) -> dict:
+    """통계 페이지의 모든 집계를 한 번에 계산 (캐시/벤치마크용)
+
+    없는 항목은 키 자체가 빠짐 - 이벤트가 없으면 "funnel" 없음, timestamp 가 없으면 "returning" 없음 등
+    workers > 1 이면 퍼널/체류/재방문 집계를 client_id 로 나눠 프로세스 풀에서 계산 (결과는 같음)
+    days 가 있으면(visit_tracker.day_counts) 방문일 수를, dwell 이 있으면(dwell_tracker.summary) 체류 시간을 이벤트에서 다시 세지 않음
+    """
+    snapshot = {}
+
+    if not events.empty:
+        snapshot["has_timestamp"] = has_timestamp = "timestamp" in events.columns
+        snapshot["sampled"] = sampled = is_sampled(events)
+        with_days, with_dwell = days is None, dwell is None
+        if with_days or with_dwell:   # 둘 다 받았으면 timestamp 는 쓰지 않음
+            events = prepare_events(events)
+        if workers > 1:
+            from stats_parallel import parallel_partials
+            with span("stats.parallel_partials"):
+                partials = parallel_partials(events, has_timestamp, workers, with_days, with_dwell)
+        else:
+            partials = [event_partials(events, has_timestamp, with_days, with_dwell)]
+        with span("stats.merge"):
+            snapshot.update(merge_partials(partials, has_timestamp, sampled, days, dwell))
+
+    if not survey.empty:
+        snapshot["survey_count"] = len(survey)
+        snapshot["mean_abv"] = survey["abv"].mean() if "abv" in survey.columns else None
+        if {"mood", "recommended"}.issubset(survey.columns):
+            with span("stats.mood_pivot"):
+                snapshot["mood_pivot"] = mood_pivot(survey)
+        if "food" in survey.columns:
+            with span("stats.food"):
+                snapshot["food"] = food_counts(survey)
+        if not events.empty and "recommended" in survey.columns:
+            with span("stats.category_conversion"):
+                index = recommendation_index(survey)
+                if not index.empty:
+                    snapshot["linked_surveys"] = len(index)
+                    snapshot["category_conversion"] = category_conversion(index, events)
+
+    return snapshot
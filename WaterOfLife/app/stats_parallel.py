@@ -0,0 +1,92 @@
+"""퍼널/체류 시간/재방문 집계를 여러 CPU 코어로 나눠 계산
+
+이 집계들은 모두 client 단위라서 client_id 로 이벤트를 나누면 묶음끼리 겹치는 client 가 없음
+→ 워커마다 stats_core.event_partials 를 계산하고 부모가 stats_core.merge_partials 로 합치면 한 프로세스 결과와 같음
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import stats_core
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """프로세스당 하나의 풀을 계속 재사용 (워커가 pandas 를 매번 다시 import 하지 않도록)
+
+    Streamlit 서버는 스레드가 많아 fork 하면 다른 스레드가 잡고 있던 잠금이 자식에 그대로 남을 수 있음 → forkserver
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            context = multiprocessing.get_context("forkserver")
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _pool_workers = workers
+        return _pool
+
+
+def _partial(columns: dict) -> dict:
+    """워커: 배열 묶음 → DataFrame → 부분 집계 (client_id 는 정수 코드)"""
+    frame = {
+        "client_id": columns["client_id"],
+        "event": pd.Categorical.from_codes(columns["event"], categories=columns["event_names"]),
+    }
+    for name in ("timestamp", "weight"):
+        if name in columns:
+            frame[name] = columns[name]
+    return stats_core.event_partials(
+        pd.DataFrame(frame), columns["has_timestamp"], columns["with_days"], columns["with_dwell"]
+    )
+
+
+def _partitions(events: pd.DataFrame, has_timestamp: bool, parts: int, with_days: bool = True,
+                with_dwell: bool = True) -> tuple:
+    """(client_id 코드 % parts 로 나눈 묶음별 배열 목록, 코드 → client_id)
+
+    문자열 대신 정수 코드라 워커로 보내는 양이 작음
+    """
+    codes, clients = pd.factorize(events["client_id"])
+    event_codes, event_names = pd.factorize(events["event"])
+
+    # client_id 가 없는 행(-1)은 한 프로세스 계산에서도 집계되지 않으므로 제외
+    part_of_row = np.where(codes >= 0, codes % parts, parts)
+    order = np.argsort(part_of_row, kind="stable")
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(part_of_row, minlength=parts + 1))])
+
+    columns = {"client_id": codes[order], "event": event_codes[order]}
+    if has_timestamp and (with_days or with_dwell):
+        columns["timestamp"] = events["timestamp"].to_numpy()[order]
+    if "weight" in events.columns:
+        columns["weight"] = stats_core._row_weights(events).to_numpy()[order]
+
+    shared = {"event_names": list(event_names), "has_timestamp": has_timestamp, "with_days": with_days,
+              "with_dwell": with_dwell}
+    return [
+        {**{name: values[bounds[i]:bounds[i + 1]] for name, values in columns.items()}, **shared}
+        for i in range(parts)
+    ], np.asarray(clients)
+
+
+def _restore_clients(partial: dict, clients: np.ndarray) -> dict:
+    """정수 코드 index → 원래 client_id (표본 가중치 계산에 client_id 해시가 필요)"""
+    for name in ("diff_sec", "dwell_weights", "days"):
+        if name in partial:
+            series = partial[name]
+            series.index = pd.Index(clients[series.index.to_numpy(dtype=np.int64)], name="client_id")
+    return partial
+
+
+def parallel_partials(events: pd.DataFrame, has_timestamp: bool, workers: int, with_days: bool = True,
+                      with_dwell: bool = True) -> list:
+    """stats_core.event_partials 를 client_id 묶음별로 워커 프로세스에서 계산"""
+    partitions, clients = _partitions(events, has_timestamp, workers, with_days, with_dwell)
+    results = _get_pool(workers).map(_partial, partitions)
+    return [_restore_clients(partial, clients) for partial in results]
@@ -0,0 +1,158 @@
+import fcntl
+import threading
+import time
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from change_notifier import mark_published
+from event_store import RETENTION_DAYS, data_signature, read_stream
+from memory_budget import MB, SizedLRU, track
+from perf import span
+from settings import DATA_DIR, get_setting
+from shared_snapshot import SharedSnapshot
+import stats_core
+import dwell_tracker
+import visit_tracker
+
+# 통계 페이지 기간 선택지 (일, None = 보관 데이터 포함 전체) - 게시자가 미리 계산해 공유
+# EVENT_RETENTION_DAYS=7 처럼 겹치면 하나만
+PERIOD_DAYS = tuple(dict.fromkeys((7, RETENTION_DAYS, None)))
+
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+PUBLISH_INTERVAL = get_setting("STATS_PUBLISH_INTERVAL", 2.0)   # 게시자가 데이터 변경을 확인하는 주기 (초)
+MAX_AGE = get_setting("STATS_SNAPSHOT_MAX_AGE", 60.0)           # 데이터가 그대로여도 기간 창이 밀리므로 이 주기로 재게시
+ELECTION_INTERVAL = 10.0                                        # 게시자가 아닌 프로세스가 게시자 자리를 다시 노려보는 주기
+
+# 이벤트가 이 행 수 이상이면 퍼널/체류/재방문 집계를 STATS_WORKERS 개 프로세스로 나눠 계산 (1 이면 항상 한 프로세스)
+STATS_WORKERS = get_setting("STATS_WORKERS", 1)
+PARALLEL_MIN_ROWS = get_setting("STATS_PARALLEL_MIN_ROWS", 1_000_000)
+
+# (기간, 데이터 signature) → 스냅샷. 모든 세션이 공유하며 합계가 이 크기를 넘으면 오래된 것부터 버림
+CACHE_MAX_MB = get_setting("STATS_CACHE_MAX_MB", 200.0)
+
+
+def _compute_snapshot(period_days, signature: tuple = None) -> dict:
+    """signature 는 계산 직전의 data_signature() - 어떤 데이터로 만든 스냅샷인지 (캐시 키, 게시자의 변경 확인)"""
+    start = datetime.now() - timedelta(days=period_days) if period_days else None
+    include_archive = period_days is None
+
+    with span("stats.load_events"):
+        events = read_stream("events", start=start, include_archive=include_archive)
+    with span("stats.load_survey"):
+        survey = read_stream("survey_results", start=start, include_archive=include_archive)
+
+    workers = STATS_WORKERS if len(events) >= PARALLEL_MIN_ROWS else 1
+    with span("stats.visit_days"):
+        days = visit_tracker.day_counts(period_days)   # 이벤트를 다시 세지 않고 방문일 bitset 에서
+    with span("stats.dwell_sketch"):
+        dwell = dwell_tracker.summary(period_days)   # client 별 시각을 다시 조인하지 않고 날짜별 스케치를 합침
+    snapshot = stats_core.compute_snapshot(events, survey, workers=workers, days=days, dwell=dwell)
+    snapshot["visits_tracked"] = days is not None
+    snapshot["dwell_tracked"] = dwell is not None
+    snapshot["data_signature"] = signature
+    snapshot["built_at"] = datetime.now()
+    return snapshot
+
+
+_snapshots = SizedLRU("stats_snapshot", CACHE_MAX_MB * MB)
+
+
+def _build_snapshot(period_days, signature):
+    """데이터가 바뀌지 않았으면(같은 signature) 모든 세션이 같은 집계 결과를 공유
+
+    세션마다 복사본을 만들지 않음 - 호출 측에서 수정하면 안 됨
+    """
+    return _snapshots.get_or_create((period_days, signature), lambda: _compute_snapshot(period_days, signature))
+
+
+# ---------------------------- #
+#        공유 스냅샷 (프로세스 간)
+# ---------------------------- #
+
+_shared = {
+    period_days: SharedSnapshot(SNAPSHOT_DIR / f"stats-{period_days or 'all'}.snap")
+    for period_days in PERIOD_DAYS
+}
+
+
+def _try_become_publisher():
+    """게시자 잠금을 잡으면 파일을 열어 둔 채 반환 (프로세스가 끝나면 잠금도 풀림)"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    lock_file = open(DATA_DIR / ".stats_publisher.lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def run_publisher(stop: threading.Event = None):
+    """게시자 루프 - 호스트에서 잠금을 잡은 프로세스 하나만 집계해서 게시"""
+    stop = stop or threading.Event()
+    lock_file = None
+    while lock_file is None and not stop.is_set():
+        lock_file = _try_become_publisher()
+        if lock_file is None:
+            stop.wait(ELECTION_INTERVAL)
+    if lock_file is None:
+        return
+
+    print("[stats_snapshot] 이 프로세스가 통계 스냅샷을 게시합니다.")
+    last_signature, last_publish = None, 0.0
+    while not stop.is_set():
+        signature = data_signature()
+        changed = signature != last_signature
+        if changed or time.time() - last_publish > MAX_AGE:
+            try:
+                with span("stats.publish"):
+                    for period_days in PERIOD_DAYS:
+                        _shared[period_days].publish(_compute_snapshot(period_days, signature))
+                last_signature, last_publish = signature, time.time()
+                if changed:
+                    mark_published()   # 쓰기 직후 옛 스냅샷을 받은 세션을 다시 깨움
+            except Exception as e:
+                print("[stats_snapshot] 게시 실패:", repr(e))
+        stop.wait(PUBLISH_INTERVAL)
+
+
+@st.cache_resource(show_spinner=False)
+def start_publisher():
+    """프로세스당 한 번 게시자 후보 스레드 시작 (다른 프로세스/사이드카가 게시 중이면 대기만)"""
+    thread = threading.Thread(target=run_publisher, name="stats-publisher", daemon=True)
+    thread.start()
+    return thread
+
+
+_latest = {}   # 기간별 마지막으로 돌려준 스냅샷 (과부하 모드에서 재계산 없이 사용)
+
+track("stats_snapshot.shared", lambda: [shared.cached for shared in _shared.values()])
+
+
+def load_snapshot(period_days=None, allow_stale: bool = False) -> dict:
+    """기간(일)별 통계 스냅샷. None = 보관 데이터까지 전체
+
+    게시자가 살아 있으면(최근 MAX_AGE * 2 초 안에 게시) 공유 스냅샷을 그대로 사용 (CSV 를 다시 읽지 않음).
+    그 뒤로 데이터가 바뀌었어도 직접 계산하지 않음 - 게시자가 PUBLISH_INTERVAL 안에 다시 게시하고
+    .published 표시가 바뀌면 change_notifier 가 세션을 다시 실행시킴
+    게시자가 없거나 멈췄을 때만 직접 계산. allow_stale=True 이면 오래된 스냅샷이라도 있으면 그대로 사용 (과부하 모드)
+    """
+    start_publisher()
+    if period_days in _shared:
+        shared = _shared[period_days].read()
+        if shared is not None:
+            snapshot, published_at = shared
+            alive = time.time() - published_at <= MAX_AGE * 2   # 게시자가 살아 있음
+            if allow_stale or alive:
+                return snapshot
+    if allow_stale and period_days in _latest:
+        return _latest[period_days]
+    snapshot = _build_snapshot(period_days, data_signature())
+    _latest[period_days] = snapshot
+    return snapshot
+
+
+if __name__ == "__main__":
+    # 사이드카로 실행: python WaterOfLife/app/stats_snapshot.py
+    run_publisher()
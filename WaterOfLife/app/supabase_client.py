@@ -1,7 +1,17 @@
-from supabase import create_client
+import threading
+
 import streamlit as st
 
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
+_client = None
+_client_lock = threading.Lock()
+
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+def get_supabase():
+    """Supabase 클라이언트 - 처음 쓸 때 한 번만 생성 (import 시점에는 네트워크/무거운 import 없음)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from supabase import create_client   # supabase/httpx import 가 무거워서 여기서
+                _client = create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+    return _client
@@ -0,0 +1,227 @@
+"""client 별 방문일 bitset - 이벤트를 쓸 때 갱신해서 재방문율을 이벤트 재집계 없이 계산
+
+워커마다 data/visits/<shard>.log 에 "날짜(ordinal),client_id" 를 그날 그 client 를 처음 볼 때만 한 줄 덧붙이고,
+읽는 쪽은 새로 붙은 줄만 읽어 client → (첫 방문일, 방문일 bitset) 에 OR 로 합침 (같은 줄이 여러 번 와도 결과가 같음)
+base.log 는 이 기록을 시작하기 전의 이벤트로 한 번 만든 것. 종료된 워커의 journal 은 시작할 때 base.log 에 합쳐 지움 (compact)
+"""
+import fcntl
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date
+
+import perf
+from group_commit import GroupCommitLog, fsync_dir
+from settings import DATA_DIR
+
+VISITS_DIR = DATA_DIR / "visits"
+BASE_PATH = VISITS_DIR / "base.log"
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_popcount = getattr(int, "bit_count", lambda bits: bin(bits).count("1"))   # int.bit_count 는 Python 3.10+
+
+
+def _journal_path():
+    from event_store import shard_id   # event_store 가 이 모듈을 import 하므로 여기서
+    return VISITS_DIR / f"{shard_id()}.log"
+
+
+# ---------------------------- #
+#        기록 (이벤트를 쓸 때)
+# ---------------------------- #
+
+# 파생 데이터라(base.log 를 다시 만들면 복구) 매번 fsync 하지 않음
+_journal = GroupCommitLog("visits", _journal_path, "interval", 5.0)
+_today = {"day": None, "seen": set()}   # 오늘 이미 기록한 client (날짜가 바뀌면 비움)
+_today_lock = threading.Lock()
+
+
+def record(client_id: str, day: int = None):
+    """이 client 를 오늘 처음 보면 journal 에 한 줄 (두 번째부터는 메모리 확인만)"""
+    if not client_id or "\n" in client_id:
+        return
+    day = day or date.today().toordinal()
+    with _today_lock:
+        if _today["day"] != day:
+            _today["day"], _today["seen"] = day, set()
+        if client_id in _today["seen"]:
+            return
+        _today["seen"].add(client_id)
+    try:
+        _journal.append(f"{day},{client_id}\n".encode("utf-8"))
+    except OSError as e:
+        # 방문일 기록 실패가 이벤트 기록까지 막지 않도록
+        print("[visit_tracker] 기록 실패:", repr(e))
+
+
+# ---------------------------- #
+#        읽기 (통계 계산)
+# ---------------------------- #
+
+class VisitIndex:
+    """모든 journal 을 합친 client → [첫 방문일, bitset] (bit i = 첫 방문일 + i 일에 방문)
+
+    파일별로 읽은 위치를 기억해 refresh 때 새로 붙은 줄만 읽음
+    """
+
+    def __init__(self, directory=VISITS_DIR):
+        self.directory = directory
+        self._clients = {}
+        self._offsets = {}   # 파일 이름 → (inode, 읽은 바이트 수)
+        self._lock = threading.Lock()
+        self._version = 0    # 새 줄을 합칠 때마다 +1
+        self._counts = {}    # start_day → (version, 결과) - 새 줄이 없으면 다시 세지 않음
+
+    def _add(self, client_id: str, day: int):
+        entry = self._clients.get(client_id)
+        if entry is None:
+            self._clients[client_id] = [day, 1]
+        elif day >= entry[0]:
+            entry[1] |= 1 << (day - entry[0])
+        else:
+            entry[1] = (entry[1] << (entry[0] - day)) | 1
+            entry[0] = day
+
+    def _apply(self, data: bytes):
+        for line in data.decode("utf-8").splitlines():
+            day, _, client_id = line.partition(",")
+            self._add(client_id, int(day))
+
+    def refresh(self):
+        with self._lock, perf.span("visit_tracker.refresh"):
+            paths = sorted(self.directory.glob("*.log"))
+            if set(self._offsets) - {path.name for path in paths}:
+                self._clients, self._offsets = {}, {}   # 지워진 journal 이 있으면 처음부터 다시
+                self._version += 1
+            for path in paths:
+                try:
+                    self._read_new(path)
+                except FileNotFoundError:
+                    continue
+
+    def _read_new(self, path):
+        stat = path.stat()
+        inode, offset = self._offsets.get(path.name, (stat.st_ino, 0))
+        if inode != stat.st_ino or stat.st_size < offset:
+            # base.log 를 다시 만든 경우 등 - 같은 줄을 다시 합쳐도 결과가 같으므로 이 파일만 처음부터
+            inode, offset = stat.st_ino, 0
+        if stat.st_size == offset:
+            return
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(stat.st_size - offset)
+        end = data.rfind(b"\n") + 1   # 쓰는 중인 마지막 줄은 다음에
+        self._apply(data[:end])
+        self._offsets[path.name] = (inode, offset + end)
+        self._version += 1
+
+    def day_counts(self, start_day: int = None) -> dict:
+        """client_id → 방문일 수 (start_day 이후만, 0 인 client 는 빠짐)"""
+        with self._lock:
+            cached = self._counts.get(start_day)
+            if cached is not None and cached[0] == self._version:
+                return cached[1]
+            counts = {}
+            for client_id, (first_day, bits) in self._clients.items():
+                if start_day is not None and start_day > first_day:
+                    bits >>= start_day - first_day
+                if bits:
+                    counts[client_id] = _popcount(bits)
+            self._counts = {key: value for key, value in self._counts.items() if value[0] == self._version}
+            self._counts[start_day] = (self._version, counts)
+            return counts
+
+
+_index = VisitIndex()
+
+
+def day_counts(period_days: int = None):
+    """client_id → 방문일 수 pandas Series (최근 period_days 일, None 이면 전체)
+
+    base.log 가 아직 없으면 None - 호출 측은 이벤트에서 직접 계산
+    """
+    import pandas as pd
+
+    if not BASE_PATH.exists():
+        return None
+    _index.refresh()
+    start_day = date.today().toordinal() - period_days if period_days else None
+    counts = _index.day_counts(start_day)
+    return pd.Series(counts, dtype="int64", name="방문일 수").rename_axis("client_id")
+
+
+# ---------------------------- #
+#        base.log (처음 한 번)
+# ---------------------------- #
+
+def _write_base(data: bytes):
+    VISITS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = BASE_PATH.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(BASE_PATH)
+    fsync_dir(VISITS_DIR)
+
+
+@contextmanager
+def _base_locked():
+    """base.log 를 만들거나 바꾸는 동안 (여러 워커가 동시에 시작해도 하나씩)"""
+    VISITS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(VISITS_DIR / ".base.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def rebuild():
+    """지금까지의 이벤트(보관본 포함)로 base.log 를 새로 만듦"""
+    import numpy as np
+    import pandas as pd
+    from event_store import read_stream
+
+    events = read_stream("events", include_archive=True)
+    visits = ()
+    if not events.empty and "timestamp" in events.columns:
+        events = events.dropna(subset=["client_id"])
+        ts = pd.to_datetime(events["timestamp"], format="ISO8601").to_numpy("datetime64[D]")
+        visits = pd.DataFrame({
+            "day": ts.astype(np.int64) + UNIX_EPOCH_ORDINAL,
+            "client_id": events["client_id"].astype(str),
+        }).drop_duplicates().itertuples(index=False)
+    lines = [f"{day},{client_id}\n" for day, client_id in visits]
+    _write_base("".join(lines).encode("utf-8"))
+    print(f"[visit_tracker] base.log 생성 ({len(lines)}줄)")
+
+
+def ensure_base():
+    """base.log 가 없으면 한 번 만듦 (여러 워커가 동시에 시작해도 하나만)"""
+    if BASE_PATH.exists():
+        return
+    with _base_locked():
+        if not BASE_PATH.exists():
+            rebuild()
+
+
+def compact():
+    """종료된 워커의 journal 을 base.log 에 합치고 지움 - 재시작할 때마다 journal 이 쌓여 첫 refresh 가 느려지지 않도록
+
+    base.log 를 먼저 바꾼 뒤 지우므로 중간에 죽어도 같은 줄이 두 번 남을 뿐 (OR 로 합치므로 결과는 같음)
+    """
+    from event_store import dead_shard_files
+
+    with _base_locked():
+        journals = dead_shard_files(VISITS_DIR)
+        if not journals or not BASE_PATH.exists():
+            return
+        lines = dict.fromkeys(BASE_PATH.read_bytes().splitlines(keepends=True))
+        for path in journals:
+            data = path.read_bytes()
+            lines.update(dict.fromkeys(data[:data.rfind(b"\n") + 1].splitlines(keepends=True)))   # 끊긴 마지막 줄 제외
+        _write_base(b"".join(lines))
+        for path in journals:
+            path.unlink()
+        fsync_dir(VISITS_DIR)
+    print(f"[visit_tracker] 종료된 워커 journal {len(journals)}개를 base.log 에 합침")
@@ -0,0 +1,117 @@
+import threading
+import time
+
+import streamlit as st
+
+import perf
+
+# 마지막 워밍업 결과 (관리자 성능 페이지에서 표시)
+_report = []
+_report_lock = threading.Lock()
+
+
+def _recover_events():
+    # 종료된 워커가 쓰다 만 줄 / manifest 에 빠진 세그먼트 정리 (통계 집계 전에)
+    from event_store import recover
+    recover()
+
+
+def _build_visit_base():
+    # 방문일 bitset 의 시작점 - 처음 한 번만 이벤트 전체를 읽음
+    from visit_tracker import compact, ensure_base
+    ensure_base()
+    compact()   # 종료된 워커의 journal 정리
+
+
+def _build_dwell_base():
+    # 체류 시간 스케치의 시작점 - 처음 한 번만 이벤트 전체를 읽음 + 재시작 전 워커의 설문 시각 이어받기
+    from dwell_tracker import compact, ensure_base, load_pending
+    ensure_base()
+    compact()
+    load_pending()
+
+
+def _warm_catalog():
+    # 추천 소개 블록 + 축소 이미지/갤러리까지 미리 생성
+    from drink_catalog import load_catalog
+    load_catalog()
+
+
+def _warm_static_assets():
+    # 홈 화면 이미지 축소본을 static/img 에 미리 생성
+    from static_assets import HOME_IMAGES, asset_url
+    for name in HOME_IMAGES:
+        asset_url(name)
+
+
+def _warm_recommender():
+    # 추천 로직은 아직 규칙 기반이라 미리 만들 표가 없음 - import 와 첫 호출 비용만 먼저 치름
+    from recommender import recommend_drink, COMPANIONS, MOODS, ABV_MIN, TASTES, FOODS
+    recommend_drink(COMPANIONS[0], MOODS[0], ABV_MIN, TASTES[0], FOODS[0])
+
+
+def _warm_supabase():
+    # 클라이언트 생성 + 가벼운 조회 한 번으로 HTTP 연결까지 열어 둠
+    from page_counter import get_all_page_views
+    get_all_page_views()
+
+
+def _warm_stats():
+    from event_store import RETENTION_DAYS
+    from stats_snapshot import load_snapshot
+    load_snapshot(RETENTION_DAYS)   # 통계 페이지 기본 기간
+
+
+STEPS = [
+    ("event_recovery", _recover_events),
+    ("visit_tracker", _build_visit_base),
+    ("dwell_tracker", _build_dwell_base),
+    ("drink_catalog", _warm_catalog),
+    ("static_assets", _warm_static_assets),
+    ("recommender", _warm_recommender),
+    ("supabase", _warm_supabase),
+    ("stats_snapshot", _warm_stats),
+]
+
+
+def run_warmup():
+    """단계별로 실행하고 소요 시간 기록 (한 단계가 실패해도 나머지는 계속)"""
+    results = []
+    for name, step in STEPS:
+        start = time.perf_counter()
+        error = None
+        try:
+            with perf.span(f"warmup.{name}"):
+                step()
+        except Exception as e:
+            error = repr(e)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        results.append({"step": name, "ms": round(elapsed_ms, 1), "ok": error is None, "error": error})
+        print(f"[warmup] {name}: {elapsed_ms:.0f}ms" + (f" 실패 {error}" if error else ""))
+
+    with _report_lock:
+        _report[:] = results
+    return results
+
+
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    """서버 프로세스당 한 번만 백그라운드로 워밍업 시작
+
+    Streamlit 에는 서버 시작 훅이 없어서 첫 페이지 요청 때 시작됨 - 화면은 기다리지 않음
+    읽기 전용 통계 API 와 실시간 사용자 기록 스레드도 여기서 같이 띄움
+    """
+    from stats_api import start_stats_api
+    start_stats_api()
+    # 실시간 사용자 수 기록 (호스트에서 한 프로세스만 실제로 조회, 나머지는 대기)
+    import active_history
+    threading.Thread(target=active_history.run_sampler, name="active-history", daemon=True).start()
+    thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def report():
+    """마지막 워밍업 단계별 결과 (아직 끝나지 않았으면 빈 리스트)"""
+    with _report_lock:
+        return list(_report)
@@ -0,0 +1,104 @@
+"""group commit 로그의 장애 복구 점검 (실패하면 종료 코드 1)
+
+    python WaterOfLife/benchmarks/durability_check.py
+
+- torn_tail    : 쓰다 끊긴 마지막 줄이 있는 파일을 다시 열면 그 줄만 잘려 나가는지
+- failed_write : write 가 batch 일부만 쓰고 실패(ENOSPC 등)해도 다음 기록이 깨진 줄 뒤에 붙지 않는지
+- failed_rollback : 그 뒤 되돌리기(ftruncate)까지 실패해도 다음 기록 전에 깨진 줄이 잘려 나가는지
+임시 폴더에서만 실행하므로 data/ 는 건드리지 않습니다.
+"""
+import errno
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+import group_commit
+from group_commit import GroupCommitLog
+
+HEADER = b"timestamp,client_id,event\n"
+
+
+def _row(client_id: str) -> bytes:
+    return f"{datetime.now().isoformat()},{client_id},survey_completed\n".encode()
+
+
+def _valid_rows(path: Path) -> list:
+    """헤더 뒤 모든 줄이 '시각,client,이벤트' 모양인지 확인하고 client_id 목록 반환"""
+    lines = path.read_bytes().split(b"\n")
+    assert lines[0] + b"\n" == HEADER and lines[-1] == b"", "헤더 또는 마지막 줄바꿈이 깨짐"
+    clients = []
+    for line in lines[1:-1]:
+        try:
+            timestamp, client_id, event = line.decode().split(",")
+            datetime.fromisoformat(timestamp)
+        except ValueError:
+            raise AssertionError(f"깨진 줄: {line!r}")
+        assert event == "survey_completed", f"깨진 줄: {line!r}"
+        clients.append(client_id)
+    return clients
+
+
+def check_torn_tail(directory: Path):
+    path = directory / "torn.csv"
+    path.write_bytes(HEADER + _row("c1") + _row("c2")[:10])
+    log = GroupCommitLog("torn", lambda: path, "write")
+    log.append(_row("c3"), header=HEADER)
+    assert _valid_rows(path) == ["c1", "c3"], _valid_rows(path)
+
+
+def check_failed_write(directory: Path, rollback_fails: bool = False):
+    path = directory / ("failed-rollback.csv" if rollback_fails else "failed.csv")
+    log = GroupCommitLog("failed", lambda: path, "batch")
+    log.append(_row("c1"), header=HEADER)
+
+    real_write, real_ftruncate = os.write, os.ftruncate
+
+    def flaky_write(fd, data):
+        # 절반만 쓰고 디스크가 가득 찬 것처럼 실패
+        real_write(fd, bytes(data[:len(data) // 2]))
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    def failing_ftruncate(fd, length):
+        raise OSError(errno.EIO, "Input/output error")
+
+    group_commit.os.write = flaky_write
+    if rollback_fails:
+        group_commit.os.ftruncate = failing_ftruncate
+    try:
+        log.append(_row("c2"), header=HEADER)
+        raise AssertionError("실패한 write 가 OSError 로 전달되지 않음")
+    except OSError:
+        pass
+    finally:
+        group_commit.os.write, group_commit.os.ftruncate = real_write, real_ftruncate
+
+    log.append(_row("c3"), header=HEADER)
+    assert _valid_rows(path) == ["c1", "c3"], _valid_rows(path)
+
+
+CHECKS = [
+    ("torn_tail", check_torn_tail),
+    ("failed_write", check_failed_write),
+    ("failed_rollback", lambda directory: check_failed_write(directory, rollback_fails=True)),
+]
+
+
+def main() -> int:
+    failed = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, check in CHECKS:
+            try:
+                check(Path(tmp))
+                print(f"[durability] {name}: ok")
+            except AssertionError as e:
+                failed += 1
+                print(f"[durability] {name}: 실패 - {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
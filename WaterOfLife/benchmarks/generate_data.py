@@ -0,0 +1,125 @@
+"""벤치마크용 합성 events.csv / survey_results.csv 생성기
+
+    python WaterOfLife/benchmarks/generate_data.py --rows 100k --out /tmp/wol-100k
+
+같은 --seed 면 항상 같은 데이터가 나옵니다.
+"""
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+sys.path.insert(0, str(APP_DIR))
+
+from recommender import recommend_drink, COMPANIONS, MOODS, ABV_MIN, ABV_MAX, TASTES, FOODS  # noqa: E402
+
+START = datetime(2025, 1, 1)
+DAYS = 60                 # 데이터가 걸쳐 있는 기간
+EVENTS_PER_CLIENT = 2.5   # 실제 평균은 약 3개 - 넉넉히 만든 뒤 시간순으로 rows 개만 사용
+
+# 방문 한 번에서 각 단계까지 갈 확률
+P_SURVEY = 0.45
+P_STATS_AFTER_SURVEY = 0.5
+P_PURCHASE_AFTER_SURVEY = 0.25
+
+
+def parse_rows(text: str) -> int:
+    """'10k', '1M' 같은 표기를 정수로"""
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    number = text[:-1] if text[-1] in "km" else text
+    return int(float(number) * scale)
+
+
+def _iso(seconds: np.ndarray) -> np.ndarray:
+    """START 기준 초 → log_event 와 같은 ISO 문자열"""
+    ts = pd.Timestamp(START) + pd.to_timedelta(seconds, unit="s")
+    return ts.strftime("%Y-%m-%dT%H:%M:%S.%f").to_numpy()
+
+
+def _client_ids(rows: int) -> np.ndarray:
+    n_clients = max(1, int(rows / EVENTS_PER_CLIENT))
+    return np.array([f"client-{i:08d}" for i in range(n_clients)])
+
+
+def generate_events(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    client_ids = _client_ids(rows)
+    n_clients = len(client_ids)
+
+    # 방문: 대부분 하루, 일부는 여러 날 재방문
+    visits_per_client = rng.geometric(0.6, n_clients)
+    visit_client = np.repeat(np.arange(n_clients), visits_per_client)
+    visit_time = rng.uniform(0, DAYS * 86400, len(visit_client))
+
+    parts = [("home_viewed", visit_client, visit_time)]
+
+    survey_mask = rng.random(len(visit_client)) < P_SURVEY
+    survey_time = visit_time[survey_mask] + rng.exponential(90, survey_mask.sum())
+    survey_client = visit_client[survey_mask]
+    parts.append(("survey_completed", survey_client, survey_time))
+
+    stats_mask = rng.random(len(survey_client)) < P_STATS_AFTER_SURVEY
+    parts.append(("stats_viewed", survey_client[stats_mask],
+                  survey_time[stats_mask] + rng.exponential(60, stats_mask.sum())))
+
+    purchase_mask = rng.random(len(survey_client)) < P_PURCHASE_AFTER_SURVEY
+    parts.append(("purchase_clicked", survey_client[purchase_mask],
+                  survey_time[purchase_mask] + rng.exponential(30, purchase_mask.sum())))
+
+    event = np.concatenate([np.full(len(c), name) for name, c, _ in parts])
+    client = np.concatenate([c for _, c, _ in parts])
+    seconds = np.concatenate([t for _, _, t in parts])
+
+    order = np.argsort(seconds, kind="stable")[:rows]
+    return pd.DataFrame({
+        "timestamp": _iso(seconds[order]),
+        "client_id": client_ids[client[order]],
+        "event": event[order],
+    })
+
+
+def generate_survey(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "timestamp": _iso(np.sort(rng.uniform(0, DAYS * 86400, rows))),
+        "client_id": rng.choice(_client_ids(rows), rows),
+        "companion": rng.choice(COMPANIONS, rows),
+        "mood": rng.choice(MOODS, rows),
+        "abv": rng.integers(ABV_MIN, ABV_MAX + 1, rows),
+        "taste_pref": rng.choice(TASTES, rows),
+        "food": rng.choice(FOODS, rows),
+    })
+
+    # 추천 결과는 실제 로직으로 (보기 조합이 적어서 조합별로 한 번만 계산)
+    keys = ["companion", "mood", "abv", "taste_pref", "food"]
+    combos = df[keys].drop_duplicates()
+    combos["recommended"] = [recommend_drink(*row)[0] for row in combos.itertuples(index=False)]
+    return df.merge(combos, on=keys, how="left")
+
+
+def generate(rows: int, out_dir: Path, seed: int = 0):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    events_path = out_dir / "events.csv"
+    survey_path = out_dir / "survey_results.csv"
+    generate_events(rows, rng).to_csv(events_path, index=False)
+    generate_survey(rows, rng).to_csv(survey_path, index=False)
+    return events_path, survey_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10k", help="행 수 (예: 10k, 100k, 1M, 10M)")
+    parser.add_argument("--out", required=True, type=Path, help="출력 폴더")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for path in generate(parse_rows(args.rows), args.out, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
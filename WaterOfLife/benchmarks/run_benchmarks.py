@@ -0,0 +1,214 @@
+"""저장 / 통계 / 추천 경로 벤치마크
+
+    # 측정 후 JSON 저장
+    python WaterOfLife/benchmarks/run_benchmarks.py --sizes 10k,100k --out results.json
+
+    # 저장해 둔 기준값과 비교 (느려진 항목이 있으면 종료 코드 1)
+    python WaterOfLife/benchmarks/run_benchmarks.py --sizes 10k,100k --compare baseline.json
+
+크기마다 별도 프로세스에서 WOL_DATA_DIR 를 합성 데이터 폴더로 지정해 실행하므로
+실제 data/ 폴더는 건드리지 않고, 최대 메모리도 크기별로 따로 잽니다.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCH_DIR.parent / "app"
+CACHE_DIR = BENCH_DIR / ".data"   # 생성한 합성 데이터 재사용 (git 에 올리지 않음)
+
+DEFAULT_SIZES = "10k,100k,1M,10M"
+WRITE_OPS = 500        # 쓰기 비용 측정 횟수
+RECOMMEND_OPS = 50_000 # 추천 처리량 측정 횟수
+
+# 지표 이름 → 값이 클수록 좋은지 여부 (비교 모드에서 방향 판단)
+HIGHER_IS_BETTER = {"recommend_per_s"}
+
+
+# ---------------------------- #
+#        WORKER (크기 하나 측정)
+# ---------------------------- #
+
+def _timeit(func, ops: int) -> float:
+    """한 번 호출당 평균 시간 (마이크로초)"""
+    start = time.perf_counter()
+    for i in range(ops):
+        func(i)
+    return (time.perf_counter() - start) / ops * 1e6
+
+
+def run_worker() -> dict:
+    """WOL_DATA_DIR 가 합성 데이터 복사본을 가리키는 상태에서 실행됨"""
+    sys.path.insert(0, str(APP_DIR))
+    import event_store
+    import stats_core
+    from recommender import recommend_drink, COMPANIONS, MOODS, ABV_MIN, ABV_MAX, TASTES, FOODS
+
+    results = {}
+
+    # 1) 통계 페이지 전체 집계 (읽기 + 계산) 시간과 최대 메모리
+    tracemalloc.start()
+    start = time.perf_counter()
+    events = event_store.read_stream("events")
+    survey = event_store.read_stream("survey_results")
+    results["stats_read_s"] = time.perf_counter() - start
+    stats_core.compute_snapshot(events, survey)
+    results["stats_total_s"] = time.perf_counter() - start
+    results["stats_peak_mb"] = tracemalloc.get_traced_memory()[1] / 1024 / 1024   # Python/numpy 할당
+    tracemalloc.stop()
+    results["stats_rss_peak_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # Arrow 버퍼 포함
+
+    # 병렬 집계 (코어가 2개 이상일 때만 - 워커 시작 비용은 제외하고 측정)
+    workers = min(4, os.cpu_count() or 1)
+    if workers > 1:
+        stats_core.compute_snapshot(events.head(1000), survey, workers=workers)
+        start = time.perf_counter()
+        stats_core.compute_snapshot(events, survey, workers=workers)
+        results["stats_parallel_s"] = time.perf_counter() - start
+    del events, survey
+
+    # 방문일 bitset 으로 재방문 집계 - 프로세스 시작 후 첫 호출(journal 전체 읽기) 기준, 이후는 새 줄만 읽음
+    import visit_tracker
+    visit_tracker.ensure_base()   # base.log 생성은 처음 한 번이므로 제외
+    start = time.perf_counter()
+    visit_tracker.day_counts()
+    results["visit_days_s"] = time.perf_counter() - start
+
+    # 체류 시간 스케치 - 위와 같이 첫 호출 기준
+    import dwell_tracker
+    dwell_tracker.ensure_base()
+    start = time.perf_counter()
+    dwell_tracker.summary()
+    results["dwell_sketch_s"] = time.perf_counter() - start
+
+    # 2) 쓰기 비용 - 첫 호출(로테이션 등)은 제외하고 측정
+    event_store.log_event("bench-warmup", "home_viewed")
+    results["log_event_us"] = _timeit(lambda i: event_store.log_event(f"bench-{i}", "home_viewed"), WRITE_OPS)
+
+    event_store.save_result(COMPANIONS[0], MOODS[0], 12, TASTES[0], FOODS[0], "와인")
+    results["save_result_us"] = _timeit(
+        lambda i: event_store.save_result(COMPANIONS[i % 4], MOODS[i % 5], 12, TASTES[i % 4], FOODS[i % 5], "와인"),
+        WRITE_OPS,
+    )
+
+    # 3) 추천 처리량
+    rng = random.Random(0)
+    answers = [
+        (rng.choice(COMPANIONS), rng.choice(MOODS), rng.randint(ABV_MIN, ABV_MAX), rng.choice(TASTES), rng.choice(FOODS))
+        for _ in range(RECOMMEND_OPS)
+    ]
+    start = time.perf_counter()
+    for answer in answers:
+        recommend_drink(*answer)
+    results["recommend_per_s"] = RECOMMEND_OPS / (time.perf_counter() - start)
+
+    return results
+
+
+# ---------------------------- #
+#        RUNNER
+# ---------------------------- #
+
+def _dataset(size: str, seed: int) -> Path:
+    """크기별 합성 데이터 (없으면 생성)"""
+    sys.path.insert(0, str(BENCH_DIR))
+    from generate_data import generate, parse_rows
+
+    out_dir = CACHE_DIR / f"{size}-seed{seed}-v2"   # v2: 설문에 client_id 포함
+    if not (out_dir / "events.csv").exists():
+        print(f"[bench] {size} 합성 데이터 생성 중...", file=sys.stderr)
+        generate(parse_rows(size), out_dir, seed)
+    return out_dir
+
+
+def run_size(size: str, seed: int) -> dict:
+    source = _dataset(size, seed)
+    with tempfile.TemporaryDirectory(prefix="wol-bench-") as tmp:
+        # 쓰기 측정이 원본을 바꾸지 않도록 복사본에서 실행
+        for name in ("events.csv", "survey_results.csv"):
+            shutil.copy(source / name, Path(tmp) / name)
+
+        # 연속 쓰기를 측정하므로 전체/설문 속도 제한은 끔 (client 별 제한 확인 비용은 log_event 에 포함)
+        env = dict(os.environ, WOL_DATA_DIR=tmp, EVENT_ROTATE_DAILY="false",
+                   EVENT_RATE_GLOBAL="0", SURVEY_RATE_PER_CLIENT="0", SURVEY_RATE_GLOBAL="0")
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker"],
+            env=env, capture_output=True, text=True, check=True,
+        )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(current: dict, baseline: dict, threshold: float):
+    """기준값 대비 threshold 이상 나빠진 지표 목록"""
+    regressions = []
+    for size, metrics in current["results"].items():
+        base_metrics = baseline.get("results", {}).get(size)
+        if not base_metrics:
+            continue
+        for name, value in metrics.items():
+            base = base_metrics.get(name)
+            if not base:
+                continue
+            change = (value - base) / base
+            worse = -change if name in HIGHER_IS_BETTER else change
+            if worse > threshold:
+                regressions.append((size, name, base, value, worse))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"쉼표로 구분 (기본: {DEFAULT_SIZES})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", type=Path, help="비교할 기준 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="느려짐 허용 비율 (기본 10%%)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker()))
+        return
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        report["results"][size] = run_size(size, args.seed)
+        print(f"[bench] {size}: {json.dumps(report['results'][size], ensure_ascii=False)}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        for size, name, base, value, worse in regressions:
+            print(f"[bench] 느려짐 {size} {name}: {base:.4g} → {value:.4g} ({worse:+.0%})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("[bench] 기준 대비 느려진 항목 없음", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""페이지별 콜드 스타트 측정 (-X importtime + 첫 화면 출력까지 걸린 시간)
+
+    python WaterOfLife/benchmarks/startup_time.py                 # 모든 페이지
+    python WaterOfLife/benchmarks/startup_time.py --out startup.json
+
+페이지마다 새 파이썬 프로세스를 띄워 AppTest 로 한 번 실행합니다.
+- import_ms      : 페이지가 처음 import 한 모듈들의 누적 import 시간 (-X importtime)
+- first_render_ms: 스크립트 시작 → 첫 화면 요소(delta)가 나가기까지
+- run_ms         : 스크립트 전체 실행 시간
+Supabase 주소는 가짜 값을 넣으므로 네트워크 호출은 실패(로그만)합니다.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+PAGES = ["WaterOfLife.py", "pages/01_survey.py", "pages/02_stats.py"]
+MARKER = "#### page-start ####"
+
+# 새 프로세스에서 실행되는 코드: 하네스 import 가 끝난 뒤 MARKER 를 찍고 페이지 실행
+_CHILD = r"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+from streamlit.runtime.scriptrunner_utils import script_run_context as src
+
+first = []
+_enqueue = src.ScriptRunContext.enqueue
+def enqueue(self, msg):
+    if not first and msg.HasField("delta"):
+        first.append(time.perf_counter())
+    return _enqueue(self, msg)
+src.ScriptRunContext.enqueue = enqueue
+
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.secrets["SUPABASE_URL"] = "http://127.0.0.1:9"
+at.secrets["SUPABASE_KEY"] = "startup-bench"
+sys.stderr.write("%s\n" % sys.argv[2])
+sys.stderr.flush()
+start = time.perf_counter()
+at.run()
+end = time.perf_counter()
+print("RESULT " + json.dumps({
+    "first_render_ms": (first[0] - start) * 1000 if first else None,
+    "run_ms": (end - start) * 1000,
+}))
+"""
+
+
+def _parse_importtime(stderr: str, top: int):
+    """MARKER 이후의 importtime 줄 중 최상위(들여쓰기 없는) import 만 합산"""
+    lines = stderr.split(MARKER, 1)[-1].splitlines()
+    top_level = []
+    for line in lines:
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   self_us |   cumulative_us | <들여쓰기>module"
+        _, cumulative_us, name = line.split("|")
+        if name.startswith("  "):   # 다른 import 안에서 불린 하위 모듈
+            continue
+        top_level.append((name.strip(), int(cumulative_us) / 1000))
+    top_level.sort(key=lambda item: item[1], reverse=True)
+    return sum(ms for _, ms in top_level), top_level[:top]
+
+
+def measure(page: str, top: int) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, str(APP_DIR / page), MARKER],
+        capture_output=True, text=True, cwd=APP_DIR,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{page} 실행 실패:\n{proc.stderr[-2000:]}")
+
+    # 앱이 찍는 로그와 섞이지 않도록 RESULT 줄만 사용
+    line = next(l for l in proc.stdout.splitlines() if l.startswith("RESULT "))
+    result = json.loads(line[len("RESULT "):])
+    import_ms, slowest = _parse_importtime(proc.stderr, top)
+    result["import_ms"] = import_ms
+    result["slowest_imports"] = [{"module": name, "ms": round(ms, 1)} for name, ms in slowest]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="*", default=PAGES)
+    parser.add_argument("--top", type=int, default=8, help="가장 느린 import 몇 개를 보여줄지")
+    parser.add_argument("--out", type=Path, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = {page: measure(page, args.top) for page in args.pages}
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""추천 점수표 오프라인 튜닝 (실제 구매 클릭 기록 기준)
+
+    python WaterOfLife/tools/tune_recommender.py --search random --candidates 20000
+    python WaterOfLife/tools/tune_recommender.py --search grid --out weights.json
+
+설문 한 건의 client_id → 그 뒤 PURCHASE_WINDOW 안의 purchase_clicked 로 "추천 후 구매 버튼을 눌렀는지"를 붙이고
+(client_id 가 없는 예전 설문은 같은 시각의 survey_completed 이벤트로 추정), 후보 점수표마다 과거 기록을 다시 재생(replay)해서 평가합니다.
+- 후보가 과거와 같은 술을 추천한 설문만 결과를 알 수 있으므로 그 설문들의 구매율로 점수를 매김
+- coverage = 결과를 알 수 있었던 설문 비율 (너무 낮으면 믿기 어려움 → --min-coverage)
+설문은 보기 조합(최대 1200개) × 과거 추천 술로 묶어서 평가하므로 행 수가 많아도 후보당 비용은 거의 같습니다.
+--out 으로 저장한 JSON 은 RECOMMENDER_WEIGHTS_FILE 설정으로 앱에 적용할 수 있습니다.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+sys.path.insert(0, str(APP_DIR))
+
+PURCHASE_WINDOW = pd.Timedelta(minutes=30)   # 설문 후 이 안에 누른 구매 버튼만 인정
+MATCH_TOLERANCE = pd.Timedelta(seconds=2)    # 설문 저장과 survey_completed 기록 사이 허용 오차
+GRID_SCALES = (0.0, 0.5, 1.0, 1.5, 2.0)      # grid: 질문별 가중치 배율 후보
+
+
+# ---------------------------- #
+#        데이터
+# ---------------------------- #
+
+def load_history() -> pd.DataFrame:
+    """설문 + 그 설문 뒤 구매 클릭 여부 (WOL_DATA_DIR 의 보관 데이터 포함 전체)"""
+    from event_store import read_stream
+
+    survey = read_stream("survey_results", include_archive=True)
+    events = read_stream("events", include_archive=True)
+    if survey.empty or events.empty:
+        return pd.DataFrame()
+
+    survey["timestamp"] = pd.to_datetime(survey["timestamp"], format="ISO8601")
+    events["timestamp"] = pd.to_datetime(events["timestamp"], format="ISO8601")
+    survey = survey.sort_values("timestamp")
+
+    # client_id 가 없는 예전 설문만 같은 시각의 survey_completed 로 client_id 추정
+    if "client_id" not in survey.columns:
+        survey["client_id"] = None
+    unlinked = survey[survey["client_id"].isna()].drop(columns=["client_id"])
+    if not unlinked.empty:
+        completed = events[events["event"] == "survey_completed"][["timestamp", "client_id"]].sort_values("timestamp")
+        unlinked = pd.merge_asof(unlinked, completed, on="timestamp", direction="nearest", tolerance=MATCH_TOLERANCE)
+        survey = pd.concat([survey.dropna(subset=["client_id"]), unlinked]).sort_values("timestamp", kind="stable")
+    survey = survey.dropna(subset=["client_id"])
+
+    purchases = events[events["event"] == "purchase_clicked"][["timestamp", "client_id"]].sort_values("timestamp")
+    purchases["purchase_at"] = purchases["timestamp"]
+    survey = pd.merge_asof(
+        survey, purchases, on="timestamp", by="client_id", direction="forward", tolerance=PURCHASE_WINDOW,
+    )
+    survey["purchased"] = survey["purchase_at"].notna()
+    return survey.drop(columns=["purchase_at"])
+
+
+def build_tables(history: pd.DataFrame):
+    """보기 조합별 one-hot 행렬 X(K×F) 와 조합×과거추천 별 설문 수 N(K×C), 구매 수 P(K×C)"""
+    from recommender import CATEGORIES, DEFAULT_WEIGHTS, abv_band
+
+    history = history.assign(abv=history["abv"].map(abv_band))
+    questions = list(DEFAULT_WEIGHTS)
+    for question in questions:
+        history = history[history[question].isin(list(DEFAULT_WEIGHTS[question]))]
+    history = history[history["recommended"].isin(CATEGORIES)]
+
+    grouped = (
+        history.groupby(questions + ["recommended"], observed=True)["purchased"]
+        .agg(["size", "sum"])
+        .reset_index()
+    )
+    combos = grouped[questions].drop_duplicates().reset_index(drop=True)
+    combo_idx = grouped[questions].merge(combos.reset_index(), on=questions, how="left")["index"].to_numpy()
+    cat_idx = grouped["recommended"].map({c: i for i, c in enumerate(CATEGORIES)}).to_numpy()
+
+    N = np.zeros((len(combos), len(CATEGORIES)))
+    P = np.zeros((len(combos), len(CATEGORIES)))
+    np.add.at(N, (combo_idx, cat_idx), grouped["size"].to_numpy())
+    np.add.at(P, (combo_idx, cat_idx), grouped["sum"].to_numpy())
+
+    features = [(q, option) for q in questions for option in DEFAULT_WEIGHTS[q]]
+    X = np.zeros((len(combos), len(features)))
+    for j, (question, option) in enumerate(features):
+        X[:, j] = combos[question].to_numpy() == option
+    return X, N, P
+
+
+# ---------------------------- #
+#        점수표 ↔ 행렬
+# ---------------------------- #
+
+def _features():
+    from recommender import DEFAULT_WEIGHTS
+    return [(q, option) for q in DEFAULT_WEIGHTS for option in DEFAULT_WEIGHTS[q]]
+
+
+def to_matrix(weights: dict) -> np.ndarray:
+    """점수표 → F×C 행렬"""
+    from recommender import CATEGORIES
+    return np.array([
+        [weights[q][option].get(c, 0) for c in CATEGORIES]
+        for q, option in _features()
+    ], dtype=float)
+
+
+def from_matrix(W: np.ndarray) -> dict:
+    from recommender import CATEGORIES
+    weights = {}
+    for (q, option), row in zip(_features(), W):
+        weights.setdefault(q, {})[option] = {c: float(v) for c, v in zip(CATEGORIES, row) if v}
+    return weights
+
+
+# ---------------------------- #
+#        평가 (프로세스 풀)
+# ---------------------------- #
+
+_tables = None
+
+
+def _init_worker(X, N, P):
+    global _tables
+    _tables = (X, N, P)
+
+
+def evaluate(W: np.ndarray, X=None, N=None, P=None):
+    """후보 점수표 묶음 W(B×F×C) → (구매율 B, coverage B)
+
+    점수 = X @ W, 추천 = 행별 argmax (동점이면 CATEGORIES 앞쪽 - 앱과 같음)
+    """
+    if X is None:
+        X, N, P = _tables
+    picks = np.einsum("kf,bfc->bkc", X, W).argmax(axis=2)          # B×K
+    rows = np.arange(X.shape[0])
+    matched_n = N[rows, picks].sum(axis=1)
+    matched_p = P[rows, picks].sum(axis=1)
+    rate = np.divide(matched_p, matched_n, out=np.zeros_like(matched_p), where=matched_n > 0)
+    return rate, matched_n / N.sum()
+
+
+def random_candidates(base: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+    """기본 점수표 주변을 정수 단위로 흔든 후보 (음수는 0)"""
+    noise = rng.integers(-2, 3, size=(count,) + base.shape)
+    return np.clip(base + noise, 0, None)
+
+
+def grid_candidates(base: np.ndarray) -> np.ndarray:
+    """질문별 배율 조합 (5질문 × GRID_SCALES)"""
+    from recommender import DEFAULT_WEIGHTS
+    question_of = np.array([list(DEFAULT_WEIGHTS).index(q) for q, _ in _features()])
+    combos = itertools.product(GRID_SCALES, repeat=len(DEFAULT_WEIGHTS))
+    return np.stack([base * np.array(scales)[question_of][:, None] for scales in combos])
+
+
+def search(X, N, P, candidates: np.ndarray, workers: int, batch: int):
+    chunks = [candidates[i:i + batch] for i in range(0, len(candidates), batch)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, N, P)) as pool:
+        results = list(pool.map(evaluate, chunks))
+    rates = np.concatenate([r for r, _ in results])
+    coverage = np.concatenate([c for _, c in results])
+    return rates, coverage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--search", choices=["random", "grid"], default="random")
+    parser.add_argument("--candidates", type=int, default=20_000, help="random 후보 수")
+    parser.add_argument("--min-coverage", type=float, default=0.3, help="결과를 알 수 있는 설문 비율 하한")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=256, help="프로세스에 한 번에 넘기는 후보 수")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="가장 좋은 점수표 JSON 저장 경로")
+    args = parser.parse_args()
+
+    from recommender import DEFAULT_WEIGHTS
+
+    start = time.perf_counter()
+    history = load_history()
+    if history.empty:
+        sys.exit("설문/이벤트 데이터가 없습니다.")
+    X, N, P = build_tables(history)
+    print(f"[tune] 설문 {int(N.sum())}건 (보기 조합 {len(X)}개), 구매 {int(P.sum())}건, "
+          f"로드 {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    base = to_matrix(DEFAULT_WEIGHTS)
+    base_rate, base_coverage = evaluate(base[None], X, N, P)
+    base_rate, base_coverage = float(base_rate[0]), float(base_coverage[0])
+
+    if args.search == "grid":
+        candidates = grid_candidates(base)
+    else:
+        candidates = random_candidates(base, args.candidates, np.random.default_rng(args.seed))
+
+    start = time.perf_counter()
+    rates, coverage = search(X, N, P, candidates, args.workers, args.batch)
+    print(f"[tune] 후보 {len(candidates)}개 평가 {time.perf_counter() - start:.1f}s "
+          f"({args.workers} 프로세스)", file=sys.stderr)
+
+    eligible = np.flatnonzero(coverage >= args.min_coverage)
+    best = eligible[np.argsort(-rates[eligible], kind="stable")][:args.top]
+    report = {
+        "baseline": {"rate": base_rate, "coverage": base_coverage},
+        "top": [
+            {
+                "rate": float(rates[i]),
+                "coverage": float(coverage[i]),
+                "uplift": float(rates[i] - base_rate),
+                "uplift_ratio": float(rates[i] / base_rate - 1) if base_rate else None,
+                "weights": from_matrix(candidates[i]),
+            }
+            for i in best
+        ],
+    }
+
+    print(f"[tune] 현재 점수표 구매율 {base_rate:.2%} (coverage {base_coverage:.0%})", file=sys.stderr)
+    for rank, row in enumerate(report["top"], 1):
+        print(f"[tune] #{rank} 구매율 {row['rate']:.2%} ({row['uplift']:+.2%}p), coverage {row['coverage']:.0%}",
+              file=sys.stderr)
+
+    if args.out and report["top"]:
+        args.out.write_text(json.dumps(report["top"][0], indent=2, ensure_ascii=False), encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()